@@ -3,23 +3,44 @@
 Replacement for Elastic Workflows (Technical Preview) execution engine
 which is non-functional, implemented as an MCP (Model Context Protocol) server.
 
-MCP Tools (6):
+MCP Tools (11):
   - remember_memory: Store new experience (episodic + semantic + domain)
+  - remember_memories_batch: Store many SPO triples from one conversation (bulk)
   - reflect_consolidate: Consolidate episodes → semantic analysis
   - generate_blindspot_report: Knowledge blindspot report
   - export_knowledge_base: Export knowledge base as NDJSON
   - import_knowledge_base: Import knowledge base from NDJSON (CONFLICT detection)
   - sync_knowledge_domains: Sync staging → lookup domain indices
+  - get_slow_operations: Slow ES operation log (opt-in profiling)
+  - manage_background_tasks: Progress/cancel for long-running ES tasks
+  - rollup_access_log: Fold memory-access-log into hourly/daily rollups
+  - manage_entity_catalog: Canonical entity/attribute names and their aliases
 
 Agent Builder `mcp` type tool → .mcp connector → this server → ES REST API
 """
 
 import asyncio
+import atexit
+import base64
+import collections
+import concurrent.futures
+import contextlib
+import contextvars
+import copy
+import functools
+import hashlib
+import heapq
+import importlib
 import json
 import logging
 import os
+import random
+import re
+import socket
 import threading
 import time
+import uuid
+import weakref
 from collections import defaultdict
 from datetime import datetime, timezone
 from typing import Union
@@ -48,6 +69,7 @@ SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() == "true"
 REFLECT_INTERVAL = int(os.getenv("REFLECT_INTERVAL_SECONDS", "21600"))   # 6 hours
 BLINDSPOT_INTERVAL = int(os.getenv("BLINDSPOT_INTERVAL_SECONDS", "86400"))  # 24 hours
 SYNC_INTERVAL = int(os.getenv("SYNC_INTERVAL_SECONDS", "3600"))  # 1 hour
+ROLLUP_INTERVAL = int(os.getenv("ROLLUP_INTERVAL_SECONDS", "3600"))  # 1 hour
 
 mcp = FastMCP(
     name="hippocampus-memory-writer",
@@ -62,22 +84,82 @@ mcp = FastMCP(
 ALLOWED_INDICES = frozenset({
     "episodic-memories", "semantic-memories", "knowledge-domains",
     "knowledge-domains-staging", "memory-associations", "memory-access-log",
+    "scheduler-leases", "memory-access-rollups", "entity-catalog",
 })
 
+# Write aliases over rollover-managed backing indices (<alias>-000001, ...).
+# Search/bulk/by-query go through the alias; single-document get/update must
+# name the backing index that holds the document (hit["_index"]).
+ROLLOVER_ALIASES = frozenset({"episodic-memories", "memory-access-log"})
+_BACKING_INDEX_RE = re.compile(r"^(?P<alias>[a-z-]+)-\d{6}$")
+
+
 def _validate_index(index: str) -> str:
     if index not in ALLOWED_INDICES:
-        raise ValueError(f"Index '{index}' is not in the allowed list")
+        m = _BACKING_INDEX_RE.match(index)
+        if not m or m.group("alias") not in ROLLOVER_ALIASES:
+            raise ValueError(f"Index '{index}' is not in the allowed list")
     return index
 
+
+# Writes to these indices invalidate cached domain reports (blindspot)
+DOMAIN_INDICES = frozenset({"knowledge-domains", "knowledge-domains-staging"})
+_domain_data_generation = 0
+
+
+# Indices written during the current tool call or scheduled job (see _write_scope).
+# Later reads of them in the same call go to the primary (read-your-writes).
+_written_indices: contextvars.ContextVar[set[str] | None] = contextvars.ContextVar("written_indices", default=None)
+
+
+def _index_family(index: str) -> str:
+    """Backing index → its rollover alias; other names unchanged."""
+    m = _BACKING_INDEX_RE.match(index)
+    return m.group("alias") if m and m.group("alias") in ROLLOVER_ALIASES else index
+
+
+@contextlib.contextmanager
+def _write_scope():
+    """Track writes for read-your-writes; a nested scope shares the outer one's set."""
+    current = _written_indices.get()
+    token = _written_indices.set(current if current is not None else set())
+    try:
+        yield
+    finally:
+        _written_indices.reset(token)
+
+
+def _note_write(index: str) -> None:
+    """Record a local write so cached domain results are revalidated
+    and later reads in the same tool call see it."""
+    global _domain_data_generation
+    if index in DOMAIN_INDICES:
+        _domain_data_generation += 1
+    written = _written_indices.get()
+    if written is not None:
+        written.add(_index_family(index))
+
 MAX_FIELD_LENGTH = 256
 MAX_VALUE_LENGTH = 2000
 MAX_RAW_TEXT_LENGTH = 10000
 MAX_EXTERNAL_REFS = 10
+MAX_BATCH_TRIPLES = 100
 
 MAX_IMPORT_LINES = 1000
 MAX_IMPORT_BYTES = 5 * 1024 * 1024  # 5MB
 
 
+def _triple_error(entity: str, attribute: str, value: str, category: str) -> str | None:
+    """Length checks for one normalized SPO triple. None if valid."""
+    if len(entity) > MAX_FIELD_LENGTH or len(attribute) > MAX_FIELD_LENGTH:
+        return f"entity/attribute exceeds {MAX_FIELD_LENGTH} characters"
+    if len(value) > MAX_VALUE_LENGTH:
+        return f"value exceeds {MAX_VALUE_LENGTH} characters"
+    if len(category) > MAX_FIELD_LENGTH:
+        return f"category exceeds {MAX_FIELD_LENGTH} characters"
+    return None
+
+
 def _safe_error(e: Exception) -> str:
     error_type = type(e).__name__
     if isinstance(e, httpx.HTTPStatusError):
@@ -85,118 +167,1960 @@ def _safe_error(e: Exception) -> str:
     return error_type
 
 
+# ─── Admission Control ───────────────────────────────────────────────
+
+# Per-(identity, tool) token buckets: tool → (refill tokens/second, burst)
+TOOL_RATE_LIMITS = {
+    "remember_memory": (2.0, 20),
+    "remember_memories_batch": (0.2, 5),
+    "generate_blindspot_report": (0.5, 10),
+    "reflect_consolidate": (1 / 60, 3),
+    "export_knowledge_base": (1 / 60, 2),
+    "import_knowledge_base": (1 / 60, 3),
+    "rollup_access_log": (1 / 60, 2),
+    "sync_knowledge_domains": (1 / 60, 2),
+}
+DEFAULT_RATE_LIMIT = (5.0, 20)
+
+# Override as "tool=rate:burst,..." e.g. "remember_memory=5:50"
+for _item in filter(None, os.getenv("TOOL_RATE_LIMITS", "").split(",")):
+    _tool, _, _spec = _item.partition("=")
+    _rate, _, _burst = _spec.partition(":")
+    TOOL_RATE_LIMITS[_tool.strip()] = (float(_rate), int(_burst or 1))
+
+# Process-wide in-flight ES request cap, shared by the serving loop and the
+# scheduler threads' loops. Heavy tools may only use
+# ES_MAX_INFLIGHT - ES_RESERVED_INFLIGHT slots, so scans/bulk work can
+# never starve the latency-sensitive remember/blindspot path.
+ES_MAX_INFLIGHT = int(os.getenv("ES_MAX_INFLIGHT", "16"))
+ES_RESERVED_INFLIGHT = int(os.getenv("ES_RESERVED_INFLIGHT", "4"))
+ES_MAX_QUEUE = int(os.getenv("ES_MAX_QUEUE", "64"))
+ES_QUEUE_TIMEOUT = float(os.getenv("ES_QUEUE_TIMEOUT_SECONDS", "10"))
+
+HEAVY_TOOLS = frozenset({
+    "reflect_consolidate", "export_knowledge_base", "remember_memories_batch",
+    "import_knowledge_base", "sync_knowledge_domains", "rollup_access_log",
+})
+
+_request_identity: contextvars.ContextVar[str] = contextvars.ContextVar("request_identity", default="anonymous")
+# Identity of scheduled jobs: paced by their intervals and leases, not by token buckets
+SCHEDULER_IDENTITY = "scheduler"
+_current_tool: contextvars.ContextVar[str] = contextvars.ContextVar("current_tool", default="")
+_current_tool_input: contextvars.ContextVar[int] = contextvars.ContextVar("current_tool_input", default=0)
+
+_rate_buckets: dict[tuple[str, str], list[float]] = {}  # (identity, tool) → [tokens, last refill]
+_rate_lock = threading.Lock()
+
+
+
+class AdmissionRejected(Exception):
+    """Request rejected by admission control (429-style)."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _take_token(identity: str, tool: str) -> float:
+    """Consume one token. Returns 0 if admitted, else seconds until a token is available."""
+    rate, burst = TOOL_RATE_LIMITS.get(tool, DEFAULT_RATE_LIMIT)
+    now = time.monotonic()
+    with _rate_lock:
+        bucket = _rate_buckets.setdefault((identity, tool), [float(burst), now])
+        bucket[0] = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return round((1 - bucket[0]) / rate, 2)
+
+
+class _SharedSlots:
+    """Counting semaphore usable from any event loop in the process.
+
+    Slots are handed to waiters in FIFO order; a waiter on another loop is
+    woken with call_soon_threadsafe.
+    """
+
+    def __init__(self, limit: int):
+        self._free = limit
+        self._lock = threading.Lock()
+        self._waiters: collections.deque = collections.deque()  # (loop, future)
+
+    async def acquire(self) -> None:
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except BaseException:  # cancelled or timed out
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            self.release()  # the slot was handed over as we were cancelled
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                loop, fut = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(lambda f=fut: f.done() or f.set_result(None))
+                    return
+                except RuntimeError:  # its loop is closed
+                    continue
+            self._free += 1
+
+
+_es_limits = {
+    "all": _SharedSlots(ES_MAX_INFLIGHT),
+    "heavy": _SharedSlots(max(1, ES_MAX_INFLIGHT - ES_RESERVED_INFLIGHT)),
+    "waiting": 0,
+}
+_es_waiting_lock = threading.Lock()
+
+
+def _es_limiter() -> dict:
+    return _es_limits
+
+
+@contextlib.asynccontextmanager
+async def _es_slot():
+    """Hold one in-flight ES request slot, queueing up to ES_QUEUE_TIMEOUT."""
+    limiter = _es_limiter()
+    gates = [limiter["all"]]
+    if _current_tool.get() in HEAVY_TOOLS:
+        gates.insert(0, limiter["heavy"])
+    acquired = []
+    with _es_waiting_lock:
+        limiter["waiting"] += 1
+    try:
+        for gate in gates:
+            await asyncio.wait_for(gate.acquire(), timeout=ES_QUEUE_TIMEOUT)
+            acquired.append(gate)
+    except asyncio.TimeoutError:
+        for gate in acquired:
+            gate.release()
+        raise AdmissionRejected("es_queue_timeout", ES_QUEUE_TIMEOUT)
+    finally:
+        with _es_waiting_lock:
+            limiter["waiting"] -= 1
+    try:
+        yield
+    finally:
+        for gate in acquired:
+            gate.release()
+
+
+def _rejection(tool: str, e: AdmissionRejected) -> str:
+    return json.dumps({
+        "error": "Too many requests",
+        "status": 429,
+        "reason": e.reason,
+        "tool": tool,
+        "retry_after": e.retry_after,
+    })
+
+
+def _admission(fn):
+    """Apply per-identity rate limits and ES queue admission to an MCP tool.
+
+    Cursor continuations are served from cache and scheduled jobs are paced
+    by their intervals, so both skip the token bucket.
+    """
+    tool = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        identity = _request_identity.get()
+        input_bytes = sum(len(v.encode("utf-8")) for v in (*args, *kwargs.values()) if isinstance(v, str))
+        with _span(f"tool.{tool}", **{"tool.name": tool, "tool.identity": identity,
+                                      "tool.input_bytes": input_bytes}) as span:
+            try:
+                if not kwargs.get("cursor") and identity != SCHEDULER_IDENTITY:
+                    retry_after = _take_token(identity, tool)
+                    if retry_after:
+                        raise AdmissionRejected("rate_limited", retry_after)
+                if _es_limiter()["waiting"] >= ES_MAX_QUEUE:
+                    raise AdmissionRejected("es_queue_full", 1.0)
+            except AdmissionRejected as e:
+                logger.warning("admission: rejected %s for %s (%s, retry after %ss)",
+                               tool, identity, e.reason, e.retry_after)
+                span["status"] = "rejected"
+                span["attributes"]["admission.reason"] = e.reason
+                return _rejection(tool, e)
+
+            token = _current_tool.set(tool)
+            input_token = _current_tool_input.set(input_bytes)
+            try:
+                with _write_scope():
+                    result = await fn(*args, **kwargs)
+                span["attributes"]["tool.output_bytes"] = len(result.encode("utf-8"))
+                return result
+            except AdmissionRejected as e:
+                logger.warning("admission: %s for %s aborted (%s)", tool, identity, e.reason)
+                span["status"] = "rejected"
+                span["attributes"]["admission.reason"] = e.reason
+                return _rejection(tool, e)
+            finally:
+                _current_tool.reset(token)
+                _current_tool_input.reset(input_token)
+
+    return wrapper
+
+
+# ─── Tracing ─────────────────────────────────────────────────────────
+
+# "" (off), "jsonl" (TRACE_FILE), "log", or "module:factory" returning an exporter
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "")
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_FLUSH_SECONDS = 1.0
+TRACE_BUFFER_MAX = 10000  # spans kept while the file can't keep up; oldest are dropped
+
+_current_span: contextvars.ContextVar[dict | None] = contextvars.ContextVar("current_span", default=None)
+_span_exporters: list = []  # callables taking a finished span dict
+
+
+def _register_span_exporter(exporter) -> None:
+    """Add an exporter: any callable that accepts a finished span dict."""
+    _span_exporters.append(exporter)
+
+
+def _jsonl_exporter(path: str):
+    """Exporter appending one JSON span per line to path (for offline analysis).
+
+    Spans are buffered and serialized/written by a flusher thread every
+    TRACE_FLUSH_SECONDS, so exporting never does file I/O on the event loop.
+    """
+    buffer: collections.deque = collections.deque(maxlen=TRACE_BUFFER_MAX)
+    dropped = [0]
+    lock = threading.Lock()
+    wake = threading.Event()
+
+    def flush() -> None:
+        with lock:
+            spans = list(buffer)
+            buffer.clear()
+            lost, dropped[0] = dropped[0], 0
+        if lost:
+            logger.warning("trace: dropped %d spans (buffer full)", lost)
+        if spans:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(span, ensure_ascii=False, default=str) + "\n" for span in spans))
+
+    def run() -> None:
+        while True:
+            wake.wait(TRACE_FLUSH_SECONDS)
+            wake.clear()
+            try:
+                flush()
+            except Exception as e:
+                logger.warning("trace: writing %s failed: %s", path, e)
+
+    def export(span: dict) -> None:
+        with lock:
+            if len(buffer) == TRACE_BUFFER_MAX:
+                dropped[0] += 1
+            buffer.append(span)
+            full = len(buffer) >= TRACE_BUFFER_MAX // 2
+        if full:
+            wake.set()
+
+    threading.Thread(target=run, name="hippocampus-trace-flush", daemon=True).start()
+    atexit.register(flush)
+    return export
+
+
+def _log_exporter(span: dict) -> None:
+    logger.info("span %s", json.dumps(span, ensure_ascii=False, default=str))
+
+
+@contextlib.contextmanager
+def _span(name: str, **attributes):
+    """Trace span around a block. Nests under the current span (contextvars).
+
+    Callers may add attributes via span["attributes"] while it is open.
+    """
+    parent = _current_span.get()
+    span = {
+        "trace_id": parent["trace_id"] if parent else uuid.uuid4().hex,
+        "span_id": uuid.uuid4().hex[:16],
+        "parent_id": parent["span_id"] if parent else None,
+        "name": name,
+        "start": time.time(),
+        "status": "ok",
+        "attributes": {k: v for k, v in attributes.items() if v is not None},
+    }
+    token = _current_span.set(span)
+    started = time.perf_counter()
+    try:
+        yield span
+    except BaseException as e:
+        span["status"] = "error"
+        span["error"] = _safe_error(e) if isinstance(e, Exception) else type(e).__name__
+        raise
+    finally:
+        span["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        _current_span.reset(token)
+        for exporter in _span_exporters:
+            try:
+                exporter(span)
+            except Exception as e:
+                logger.warning("trace exporter failed: %s", e)
+
+
+if TRACE_EXPORTER == "jsonl":
+    _register_span_exporter(_jsonl_exporter(TRACE_FILE))
+elif TRACE_EXPORTER == "log":
+    _register_span_exporter(_log_exporter)
+elif TRACE_EXPORTER:
+    _module, _, _factory = TRACE_EXPORTER.partition(":")
+    _register_span_exporter(getattr(importlib.import_module(_module), _factory)())
+
+
+# ─── Query Profiling / Slow-Op Log ──────────────────────────────────
+
+# "off" (default), "slow" (re-run slow searches once with profile), "all" (profile every search)
+ES_PROFILE_MODE = os.getenv("ES_PROFILE_MODE", "off").lower()
+SLOW_OP_THRESHOLD_MS = float(os.getenv("SLOW_OP_THRESHOLD_MS", "500"))
+SLOW_OP_LOG_SIZE = int(os.getenv("SLOW_OP_LOG_SIZE", "200"))
+PROFILE_MAX_PER_MINUTE = int(os.getenv("PROFILE_MAX_PER_MINUTE", "10"))  # "slow" mode re-runs
+
+_slow_ops: collections.deque = collections.deque(maxlen=SLOW_OP_LOG_SIZE)
+_slow_ops_lock = threading.Lock()
+_profile_runs: collections.deque = collections.deque()  # monotonic timestamps of profile re-runs
+
+
+def _profile_budget() -> bool:
+    """Rate-limit profile re-runs in "slow" mode."""
+    now = time.monotonic()
+    with _slow_ops_lock:
+        while _profile_runs and now - _profile_runs[0] > 60:
+            _profile_runs.popleft()
+        if len(_profile_runs) >= PROFILE_MAX_PER_MINUTE:
+            return False
+        _profile_runs.append(now)
+        return True
+
+
+def _summarize_profile(profile: dict) -> list[dict]:
+    """Compact per-shard breakdown of an ES profile response."""
+    shards = []
+    for shard in profile.get("shards", []):
+        queries, aggs = [], []
+        for search in shard.get("searches", []):
+            for q in search.get("query", []):
+                queries.append({
+                    "type": q.get("type"),
+                    "description": (q.get("description") or "")[:120],
+                    "time_ms": round(q.get("time_in_nanos", 0) / 1e6, 2),
+                })
+        for a in shard.get("aggregations", []):
+            aggs.append({
+                "type": a.get("type"),
+                "description": a.get("description"),
+                "time_ms": round(a.get("time_in_nanos", 0) / 1e6, 2),
+            })
+        shards.append({
+            "shard": shard.get("id"),
+            "query_ms": round(sum(q["time_ms"] for q in queries), 2),
+            "aggregation_ms": round(sum(a["time_ms"] for a in aggs), 2),
+            "top_queries": sorted(queries, key=lambda q: -q["time_ms"])[:3],
+            "aggregations": sorted(aggs, key=lambda a: -a["time_ms"])[:5],
+        })
+    return shards
+
+
+def _record_slow_op(
+    operation: str,
+    index: str | None,
+    duration_ms: float,
+    request_bytes: int,
+    es_took_ms: int | None = None,
+    hits_total: int | None = None,
+    profile: dict | None = None,
+) -> None:
+    span = _current_span.get()
+    entry = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "tool": _current_tool.get() or None,
+        "tool_input_bytes": _current_tool_input.get(),
+        "operation": operation,
+        "index": index,
+        "duration_ms": round(duration_ms, 2),
+        "es_took_ms": es_took_ms,
+        "request_bytes": request_bytes,
+        "hits_total": hits_total,
+        "trace_id": span["trace_id"] if span else None,
+    }
+    if profile:
+        entry["profile"] = _summarize_profile(profile)
+    with _slow_ops_lock:
+        _slow_ops.append(entry)
+    logger.warning("slow-op: %s %s %.0fms (tool=%s)", operation, index, duration_ms, entry["tool"])
+
+
 # ─── ES Helper Functions ─────────────────────────────────────────────
 
+ES_POOL_SIZE = int(os.getenv("ES_POOL_SIZE", "32"))
+
+# Pooled keep-alive client per endpoint per event loop (scheduler threads run their own loops)
+_es_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+
+def _es_client(endpoint: str = "primary") -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    clients = _es_clients.setdefault(loop, {})
+    client = clients.get(endpoint)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(max_connections=ES_POOL_SIZE, max_keepalive_connections=ES_POOL_SIZE),
+        )
+        clients[endpoint] = client
+    return client
+
+
+# Dedicated event loop for background work that must outlive its caller's
+# loop: scheduler threads only drive theirs inside run_until_complete.
+_bg_loop: asyncio.AbstractEventLoop | None = None
+_bg_loop_lock = threading.Lock()
+
+
+def _run_in_background(coro) -> concurrent.futures.Future:
+    """Schedule coro on the background loop (started on first use)."""
+    global _bg_loop
+    with _bg_loop_lock:
+        if _bg_loop is None:
+            _bg_loop = asyncio.new_event_loop()
+            threading.Thread(target=_bg_loop.run_forever, name="hippocampus-background", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _bg_loop)
+
+
+# ─── Read/Write Endpoint Routing ──────────────────────────────
+# Searches and aggregations can go to a separate read endpoint (e.g. a
+# cross-cluster replica with the same index names) so bulk imports and
+# reflect runs on the primary don't slow Trust Gate reads. Writes, document
+# gets (leases, dedup merges), fresh=True reads and reads of an index the
+# current tool call has written go to the primary. The read endpoint is
+# health-checked every ES_HEALTH_INTERVAL_SECONDS and after
+# ES_READ_MAX_FAILURES consecutive failed requests; while it is unhealthy,
+# reads fall back to the primary.
+
+ES_READ_URL = os.getenv("ES_READ_URL", "").rstrip("/")
+ES_READ_API_KEY = os.getenv("ES_READ_API_KEY", "") or ES_API_KEY
+ES_HEALTH_INTERVAL = float(os.getenv("ES_HEALTH_INTERVAL_SECONDS", "15"))
+ES_HEALTH_TIMEOUT = float(os.getenv("ES_HEALTH_TIMEOUT_SECONDS", "3"))
+ES_READ_MAX_FAILURES = int(os.getenv("ES_READ_MAX_FAILURES", "3"))
+
+_ES_ENDPOINTS = {"primary": (ES_URL, ES_API_KEY)}
+if ES_READ_URL:
+    _ES_ENDPOINTS["read"] = (ES_READ_URL, ES_READ_API_KEY)
+
+_endpoint_health = {
+    name: {"healthy": True, "cluster_status": None, "checked_at": None, "latency_ms": None,
+           "error": None, "failures": 0, "requests": 0, "fallbacks": 0}
+    for name in _ES_ENDPOINTS
+}
+_endpoint_lock = threading.Lock()
+_health_check = {"next_m": 0.0, "started_m": None}
+
+
+def _endpoint_state() -> dict:
+    with _endpoint_lock:
+        return {name: dict(state) for name, state in _endpoint_health.items()}
+
+
+def _mark_endpoint(name: str, ok: bool, error: str | None = None) -> None:
+    """Record a request outcome; ES_READ_MAX_FAILURES in a row mark the endpoint unhealthy."""
+    with _endpoint_lock:
+        state = _endpoint_health[name]
+        if ok:
+            state["failures"] = 0
+            return
+        state["failures"] += 1
+        state["error"] = error
+        if state["healthy"] and state["failures"] >= ES_READ_MAX_FAILURES:
+            state["healthy"] = False
+            logger.warning("endpoint %s marked unhealthy after %d failures: %s", name, state["failures"], error)
+
+
+async def _check_endpoint(name: str) -> dict:
+    """GET /_cluster/health on one endpoint; red or unreachable = unhealthy."""
+    url, api_key = _ES_ENDPOINTS[name]
+    started = time.perf_counter()
+    cluster_status = error = None
+    try:
+        resp = await _es_client(name).get(
+            f"{url}/_cluster/health", headers={"Authorization": f"ApiKey {api_key}"},
+            timeout=ES_HEALTH_TIMEOUT,
+        )
+        resp.raise_for_status()
+        cluster_status = resp.json().get("status")
+        if cluster_status not in ("green", "yellow"):
+            error = f"cluster status {cluster_status}"
+    except Exception as e:
+        error = _safe_error(e)
+    with _endpoint_lock:
+        state = _endpoint_health[name]
+        if state["healthy"] != (error is None):
+            logger.warning("endpoint %s %s", name, "recovered" if error is None else f"unhealthy: {error}")
+        state.update(
+            healthy=error is None, cluster_status=cluster_status, error=error,
+            checked_at=datetime.now(timezone.utc).isoformat(),
+            latency_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+        if error is None:
+            state["failures"] = 0
+        return dict(state)
+
+
+async def _check_endpoints() -> dict:
+    """Health-check every configured endpoint concurrently."""
+    try:
+        names = list(_ES_ENDPOINTS)
+        return dict(zip(names, await asyncio.gather(*(_check_endpoint(n) for n in names))))
+    finally:
+        with _endpoint_lock:
+            _health_check["next_m"] = time.monotonic() + ES_HEALTH_INTERVAL
+            _health_check["started_m"] = None
+
+
+def _maybe_check_endpoints() -> None:
+    """Start a health check on the background loop when the last one is older than ES_HEALTH_INTERVAL.
+
+    Callers may be on a scheduler loop that stops between runs, so the check
+    never runs on the caller's loop. A check still marked running after
+    several timeouts is treated as lost and started again.
+    """
+    now_m = time.monotonic()
+    with _endpoint_lock:
+        started = _health_check["started_m"]
+        if started is not None and now_m - started < ES_HEALTH_TIMEOUT * 3:
+            return
+        if started is None and now_m < _health_check["next_m"]:
+            return
+        _health_check["started_m"] = now_m
+    _run_in_background(_check_endpoints())
+
+
+def _route(index: str | None, read: bool) -> str:
+    """Endpoint name for a request: "read" only for reads the replica may serve."""
+    if not read or "read" not in _ES_ENDPOINTS:
+        return "primary"
+    _maybe_check_endpoints()
+    written = _written_indices.get()
+    if written and index and any(_index_family(i) in written for i in index.split(",")):
+        return "primary"
+    with _endpoint_lock:
+        if not _endpoint_health["read"]["healthy"]:
+            _endpoint_health["read"]["fallbacks"] += 1
+            return "primary"
+    return "read"
+
+
+async def _es_request(
+    method: str,
+    path: str,
+    operation: str,
+    index: str | None = None,
+    body: str | None = None,
+    content_type: str = "application/json",
+    params: dict | None = None,
+    timeout: float = 30,
+    doc_count: int | None = None,
+    record_slow: bool = True,
+    read: bool = False,
+) -> httpx.Response:
+    """Send one ES REST request: admission slot + trace span around the HTTP call.
+
+    read=True marks a request the read endpoint may serve (see _route); if the
+    read endpoint fails it is retried once on the primary.
+    Requests slower than SLOW_OP_THRESHOLD_MS go to the slow-op log when
+    profiling is enabled (searches record themselves, with profile data).
+    The HTTP latency (without the admission slot wait) is also left in
+    resp.extensions["es.latency_ms"].
+    """
+    endpoint = _route(index, read)
+    with _span(
+        f"es.{operation}",
+        **{"es.operation": operation, "es.index": index, "es.doc_count": doc_count,
+           "es.bytes": len(body.encode("utf-8")) if body else 0, "es.endpoint": endpoint},
+    ) as span:
+        async with _es_slot():
+            started = time.perf_counter()
+            try:
+                resp = await _es_send(endpoint, method, path, body, content_type, params, timeout)
+                if endpoint != "primary" and (resp.status_code >= 500 or resp.status_code == 429):
+                    raise httpx.HTTPStatusError(
+                        f"HTTP {resp.status_code}", request=resp.request, response=resp,
+                    )
+            except httpx.HTTPError as e:
+                if endpoint == "primary":
+                    raise
+                logger.info("es %s on %s endpoint failed (%s), retrying on primary", operation, endpoint, e)
+                _mark_endpoint(endpoint, False, _safe_error(e))
+                with _endpoint_lock:
+                    _endpoint_health[endpoint]["fallbacks"] += 1
+                endpoint = span["attributes"]["es.endpoint"] = "primary"
+                resp = await _es_send(endpoint, method, path, body, content_type, params, timeout)
+            else:
+                if endpoint != "primary":
+                    _mark_endpoint(endpoint, True)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        span["attributes"]["http.status"] = resp.status_code
+        span["attributes"]["es.latency_ms"] = round(elapsed_ms, 2)
+        resp.extensions["es.latency_ms"] = elapsed_ms
+        if record_slow and ES_PROFILE_MODE != "off" and elapsed_ms >= SLOW_OP_THRESHOLD_MS:
+            _record_slow_op(operation, index, elapsed_ms, span["attributes"]["es.bytes"])
+        if resp.status_code >= 500 or resp.status_code == 429:
+            span["status"] = "error"
+        return resp
+
+
+async def _es_send(
+    endpoint: str,
+    method: str,
+    path: str,
+    body: str | None,
+    content_type: str,
+    params: dict | None,
+    timeout: float,
+) -> httpx.Response:
+    url, api_key = _ES_ENDPOINTS[endpoint]
+    headers = {"Authorization": f"ApiKey {api_key}"}
+    if body is not None:
+        headers["Content-Type"] = content_type
+    with _endpoint_lock:
+        _endpoint_health[endpoint]["requests"] += 1
+    return await _es_client(endpoint).request(
+        method, f"{url}{path}", params=params, headers=headers, content=body, timeout=timeout,
+    )
+
+
 async def _index_document(index: str, document: dict) -> dict:
     """Index a document via ES REST API."""
     _validate_index(index)
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(
-            f"{ES_URL}/{index}/_doc",
-            headers={
-                "Authorization": f"ApiKey {ES_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            content=json.dumps(document),
+    _note_write(index)
+    resp = await _es_request("POST", f"/{index}/_doc", "index", index, json.dumps(document), doc_count=1)
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def _profiled_search(index: str, body: dict, operation: str, fresh: bool = False) -> dict:
+    """Run _search, attaching profile: true per ES_PROFILE_MODE for slow requests.
+
+    fresh=True keeps the search on the primary (the read endpoint may lag).
+    """
+    request_body = dict(body, profile=True) if ES_PROFILE_MODE == "all" else body
+    payload = json.dumps(request_body)
+    resp = await _es_request(
+        "POST", f"/{index}/_search", operation, index, payload, record_slow=False, read=not fresh,
+    )
+    elapsed_ms = resp.extensions["es.latency_ms"]  # ES time, not time queued for an _es_slot
+    resp.raise_for_status()
+    data = resp.json()
+
+    if ES_PROFILE_MODE != "off" and elapsed_ms >= SLOW_OP_THRESHOLD_MS:
+        profile = data.get("profile")
+        if profile is None and ES_PROFILE_MODE == "slow" and _profile_budget():
+            try:
+                rerun = await _es_request(
+                    "POST", f"/{index}/_search", f"{operation}.profile", index,
+                    json.dumps(dict(body, profile=True)), record_slow=False, read=not fresh,
+                )
+                rerun.raise_for_status()
+                profile = rerun.json().get("profile")
+            except Exception as e:
+                logger.warning("profile re-run failed: %s", e)
+        _record_slow_op(
+            operation, index, elapsed_ms, len(payload.encode("utf-8")),
+            es_took_ms=data.get("took"),
+            hits_total=data.get("hits", {}).get("total", {}).get("value"),
+            profile=profile,
         )
-        resp.raise_for_status()
-        return resp.json()
+    data.pop("profile", None)
+    return data
 
 
-async def _es_search(index: str, body: dict) -> dict:
+async def _es_search(index: str, body: dict, fresh: bool = False) -> dict:
     """Search via ES REST API."""
     _validate_index(index)
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(
-            f"{ES_URL}/{index}/_search",
-            headers={
-                "Authorization": f"ApiKey {ES_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            content=json.dumps(body),
-        )
-        resp.raise_for_status()
-        return resp.json()
+    return await _profiled_search(index, body, "search", fresh)
 
 
-async def _es_aggregate(index: str, body: dict) -> dict:
+async def _es_aggregate(index: str, body: dict, fresh: bool = False) -> dict:
     """Aggregate via ES REST API (size=0 default)."""
     _validate_index(index)
     if "size" not in body:
         body["size"] = 0
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(
-            f"{ES_URL}/{index}/_search",
-            headers={
-                "Authorization": f"ApiKey {ES_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            content=json.dumps(body),
-        )
-        resp.raise_for_status()
-        return resp.json()
+    return await _profiled_search(index, body, "aggregate", fresh)
 
 
-async def _es_update_by_query(index: str, body: dict) -> dict:
-    """Bulk update via ES REST API."""
-    _validate_index(index)
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(
-            f"{ES_URL}/{index}/_update_by_query",
-            headers={
-                "Authorization": f"ApiKey {ES_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            content=json.dumps(body),
-        )
-        resp.raise_for_status()
-        return resp.json()
+COMPOSITE_PAGE_SIZE = int(os.getenv("COMPOSITE_PAGE_SIZE", "500"))
+
+
+async def _es_composite(
+    index: str,
+    field: str | None,
+    aggs: dict,
+    sources: list[dict] | None = None,
+    query: dict | None = None,
+    fresh: bool = False,
+) -> list[dict]:
+    """Collect every bucket of a composite aggregation (after_key paging).
+
+    With a single terms field, bucket keys are flattened to the field value,
+    like terms buckets. With explicit sources, keys stay {source: value} dicts.
+    """
+    buckets: list[dict] = []
+    after = None
+    while True:
+        composite: dict = {
+            "size": COMPOSITE_PAGE_SIZE,
+            "sources": sources or [{field: {"terms": {"field": field}}}],
+        }
+        if after:
+            composite["after"] = after
+        body: dict = {"aggs": {"by_key": {"composite": composite, "aggs": aggs}}}
+        if query:
+            body["query"] = query
+        resp = await _es_aggregate(index, body, fresh)
+        agg = resp.get("aggregations", {}).get("by_key", {})
+        page = agg.get("buckets", [])
+        for b in page:
+            if not sources:
+                b["key"] = b["key"][field]
+            buckets.append(b)
+        after = agg.get("after_key")
+        if not after or len(page) < COMPOSITE_PAGE_SIZE:
+            return buckets
+
+
+async def _es_scan(
+    index: str,
+    source_fields: list[str],
+    page_size: int = 100,
+    query: dict | None = None,
+    fresh: bool = False,
+):
+    """Yield every hit of an index (or of query) using search_after pagination."""
+    search_after = None
+    while True:
+        body: dict = {
+            "query": query or {"match_all": {}},
+            "size": page_size,
+            "sort": [{"_doc": "asc"}],
+            "_source": source_fields,
+        }
+        if search_after:
+            body["search_after"] = search_after
+
+        resp = await _es_search(index, body, fresh)
+        hits = resp.get("hits", {}).get("hits", [])
+        if not hits:
+            return
+        for hit in hits:
+            yield hit
+        search_after = hits[-1]["sort"]
 
 
 async def _es_delete_index(index: str) -> int:
     """Delete an ES index. Returns HTTP status code."""
     _validate_index(index)
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.delete(
-            f"{ES_URL}/{index}",
-            headers={"Authorization": f"ApiKey {ES_API_KEY}"},
-        )
-        return resp.status_code
+    _note_write(index)
+    resp = await _es_request("DELETE", f"/{index}", "delete_index", index)
+    return resp.status_code
 
 
 async def _es_create_index(index: str, body: dict) -> int:
     """Create an ES index. Returns HTTP status code."""
     _validate_index(index)
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.put(
-            f"{ES_URL}/{index}",
-            headers={
-                "Authorization": f"ApiKey {ES_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            content=json.dumps(body),
-        )
-        return resp.status_code
+    _note_write(index)
+    resp = await _es_request("PUT", f"/{index}", "create_index", index, json.dumps(body))
+    return resp.status_code
 
 
-async def _es_bulk(body: str) -> dict:
-    """Call ES _bulk API."""
-    async with httpx.AsyncClient(timeout=60) as client:
-        resp = await client.post(
-            f"{ES_URL}/_bulk",
-            headers={
-                "Authorization": f"ApiKey {ES_API_KEY}",
-                "Content-Type": "application/x-ndjson",
-            },
-            content=body,
-        )
-        resp.raise_for_status()
-        return resp.json()
+async def _es_index_exists(index: str) -> bool:
+    """HEAD the index (or alias)."""
+    _validate_index(index)
+    resp = await _es_request("HEAD", f"/{index}", "exists", index, record_slow=False)
+    if resp.status_code == 404:
+        return False
+    resp.raise_for_status()
+    return True
+
+
+async def _es_get_document(index: str, doc_id: str) -> dict | None:
+    """Get a document by id (with _seq_no/_primary_term). None if missing."""
+    _validate_index(index)
+    resp = await _es_request("GET", f"/{index}/_doc/{doc_id}", "get", index)
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def _es_mget_documents(index: str, doc_ids: list[str]) -> dict[str, dict]:
+    """Get documents by id in one request. Returns id → doc (with _seq_no/_primary_term) for found ones."""
+    _validate_index(index)
+    resp = await _es_request(
+        "POST", f"/{index}/_mget", "mget", index, json.dumps({"ids": doc_ids}), doc_count=len(doc_ids),
+    )
+    if resp.status_code == 404:
+        return {}
+    resp.raise_for_status()
+    return {d["_id"]: d for d in resp.json().get("docs", []) if d.get("found")}
+
+
+async def _es_put_document(
+    index: str,
+    doc_id: str,
+    document: dict,
+    if_seq_no: int | None = None,
+    if_primary_term: int | None = None,
+    create: bool = False,
+) -> int:
+    """Put a document by id with optional optimistic concurrency. Returns HTTP status code (409 = conflict)."""
+    _validate_index(index)
+    _note_write(index)
+    params: dict = {}
+    if create:
+        params["op_type"] = "create"
+    if if_seq_no is not None:
+        params["if_seq_no"] = if_seq_no
+        params["if_primary_term"] = if_primary_term
+    resp = await _es_request(
+        "PUT", f"/{index}/_doc/{doc_id}", "put", index, json.dumps(document),
+        params=params, doc_count=1,
+    )
+    return resp.status_code
+
+
+async def _es_update_document(
+    index: str,
+    doc_id: str,
+    partial: dict,
+    if_seq_no: int | None = None,
+    if_primary_term: int | None = None,
+) -> int:
+    """Partial-document update (fields not sent are not re-inferred). Returns HTTP status code."""
+    _validate_index(index)
+    _note_write(index)
+    params: dict = {}
+    if if_seq_no is not None:
+        params["if_seq_no"] = if_seq_no
+        params["if_primary_term"] = if_primary_term
+    resp = await _es_request(
+        "POST", f"/{index}/_update/{doc_id}", "update", index, json.dumps({"doc": partial}),
+        params=params, doc_count=1,
+    )
+    return resp.status_code
+
+
+def _bulk_action_count(body: str) -> int:
+    """Number of actions in a _bulk body (delete actions have no source line)."""
+    lines = body.splitlines()
+    count = i = 0
+    while i < len(lines):
+        op = next(iter(json.loads(lines[i])), None)
+        count += 1
+        i += 1 if op == "delete" else 2
+    return count
+
+
+async def _es_bulk(body: str, doc_count: int | None = None) -> dict:
+    """Call ES _bulk API. doc_count (actions in body) is counted when not given."""
+    resp = await _es_request(
+        "POST", "/_bulk", "bulk", body=body, content_type="application/x-ndjson",
+        timeout=60, doc_count=_bulk_action_count(body) if doc_count is None else doc_count,
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+# ─── Bulk Pipeline ─────────────────────────────────────────────
+
+BULK_MAX_DOCS = int(os.getenv("BULK_MAX_DOCS", "500"))
+BULK_MAX_BYTES = int(os.getenv("BULK_MAX_BYTES", str(5 * 1024 * 1024)))  # 5MB
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", "2"))
+BULK_MAX_RETRIES = int(os.getenv("BULK_MAX_RETRIES", "3"))
+BULK_BACKOFF_SECONDS = float(os.getenv("BULK_BACKOFF_SECONDS", "0.5"))
+
+# Item/request statuses worth retrying (rejected execution, gateway errors)
+BULK_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def _chunk_bulk(positions: list[int], payloads: list[str]) -> list[list[int]]:
+    """Split action positions into batches capped by doc count and bytes."""
+    batches: list[list[int]] = []
+    current: list[int] = []
+    current_bytes = 0
+    for pos in positions:
+        size = len(payloads[pos].encode("utf-8"))
+        if current and (len(current) >= BULK_MAX_DOCS or current_bytes + size > BULK_MAX_BYTES):
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append(pos)
+        current_bytes += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def _bulk_write(actions: list[tuple[dict, dict | None]]) -> dict:
+    """Write actions through chunked, concurrent _bulk requests.
+
+    Each action is an (action metadata, source) pair, e.g.
+    ({"index": {"_index": "episodic-memories"}}, doc). Batches are capped
+    by BULK_MAX_DOCS / BULK_MAX_BYTES, at most BULK_CONCURRENCY run at once,
+    and only items rejected with a retryable status are resent with
+    exponential backoff.
+
+    Returns a report with per-action results (input order) and failures.
+    """
+    payloads: list[str] = []
+    for meta, source in actions:
+        op = next(iter(meta))
+        _validate_index(meta[op]["_index"])
+        _note_write(meta[op]["_index"])
+        lines = [json.dumps(meta)]
+        if source is not None:
+            lines.append(json.dumps(source, ensure_ascii=False))
+        payloads.append("\n".join(lines) + "\n")
+
+    items: list[dict | None] = [None] * len(actions)
+    pending = list(range(len(actions)))
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+    batches_sent = 0
+    retried = 0
+
+    async def _send(batch: list[int]) -> list[int]:
+        """Send one batch. Returns positions that should be retried."""
+        async with semaphore:
+            try:
+                resp = await _es_bulk("".join(payloads[p] for p in batch), doc_count=len(batch))
+            except httpx.HTTPStatusError as e:
+                status = e.response.status_code
+                for p in batch:
+                    items[p] = {"status": status, "error": _safe_error(e)}
+                return batch if status in BULK_RETRY_STATUSES else []
+            except httpx.TransportError as e:
+                for p in batch:
+                    items[p] = {"status": 0, "error": _safe_error(e)}
+                return batch
+
+        retry: list[int] = []
+        for p, item in zip(batch, resp.get("items", [])):
+            result = next(iter(item.values()))
+            status = result.get("status", 0)
+            entry = {"status": status, "id": result.get("_id"), "index": result.get("_index")}
+            if "error" in result:
+                err = result["error"]
+                entry["error"] = err.get("type", "unknown") if isinstance(err, dict) else str(err)
+                if status in BULK_RETRY_STATUSES:
+                    retry.append(p)
+            items[p] = entry
+        return retry
+
+    with _span("bulk.write", **{"bulk.docs": len(actions)}) as span:
+        for attempt in range(BULK_MAX_RETRIES + 1):
+            if not pending:
+                break
+            if attempt:
+                retried += len(pending)
+                await asyncio.sleep(BULK_BACKOFF_SECONDS * (2 ** (attempt - 1)))
+            batches = _chunk_bulk(pending, payloads)
+            batches_sent += len(batches)
+            retry_lists = await asyncio.gather(*(_send(b) for b in batches))
+            pending = sorted(p for r in retry_lists for p in r)
+        span["attributes"].update({"bulk.batches": batches_sent, "bulk.retried": retried})
+
+    failures = []
+    for pos, entry in enumerate(items):
+        if entry is None or "error" in entry or entry["status"] not in (200, 201):
+            meta = actions[pos][0]
+            op = next(iter(meta))
+            failures.append({
+                "position": pos,
+                "index": meta[op]["_index"],
+                "status": entry["status"] if entry else 0,
+                "error": entry.get("error", "unknown") if entry else "not sent",
+            })
+
+    return {
+        "total": len(actions),
+        "succeeded": len(actions) - len(failures),
+        "failed": len(failures),
+        "retried": retried,
+        "batches": batches_sent,
+        "items": items,
+        "failures": failures,
+    }
+
+
+def _bulk_error_summary(label: str, report: dict) -> list[str]:
+    """Condense a _bulk_write failure report into error strings."""
+    if not report["failed"]:
+        return []
+    by_reason: dict[str, int] = defaultdict(int)
+    for f in report["failures"]:
+        by_reason[f"{f['error']} (HTTP {f['status']})"] += 1
+    return [f"{label} bulk: {count} failed — {reason}" for reason, count in by_reason.items()]
+
+
+# ─── Background ES Tasks ──────────────────────────────────────
+# update/delete-by-query and reindex can outlive any HTTP timeout on a big
+# backlog. They are submitted with wait_for_completion=false (sliced
+# automatically), recorded in an in-process registry and polled on the
+# background loop; manage_background_tasks shows progress and can cancel.
+# Documents skipped on version conflicts (conflicts=proceed) are retried
+# with a follow-up task, up to TASK_CONFLICT_RETRIES times.
+
+TASK_POLL_SECONDS = float(os.getenv("TASK_POLL_SECONDS", "2"))
+TASK_RETENTION_SECONDS = int(os.getenv("TASK_RETENTION_SECONDS", "3600"))  # keep finished tasks 1h
+TASK_INLINE_WAIT_SECONDS = float(os.getenv("TASK_INLINE_WAIT_SECONDS", "5"))
+TASK_CONFLICT_RETRIES = int(os.getenv("TASK_CONFLICT_RETRIES", "3"))
+
+_TASK_PATHS = {
+    "update_by_query": "/{index}/_update_by_query",
+    "delete_by_query": "/{index}/_delete_by_query",
+    "reindex": "/_reindex",
+}
+_TASK_ID_RE = re.compile(r"^[\w.-]+:\d+$")
+_TASK_COUNTERS = ("total", "updated", "created", "deleted", "noops", "version_conflicts", "batches")
+
+# ES task id ("node:id") → entry. Shared with scheduler threads.
+_es_tasks: dict[str, dict] = {}
+_es_tasks_lock = threading.Lock()
+
+
+def _task_progress(status: dict) -> dict:
+    progress = {k: status.get(k, 0) for k in _TASK_COUNTERS}
+    done = sum(progress[k] for k in ("updated", "created", "deleted", "noops", "version_conflicts"))
+    progress["percent"] = round(100 * done / progress["total"], 1) if progress["total"] else None
+    return progress
+
+
+def _task_snapshot(task_id: str) -> dict | None:
+    with _es_tasks_lock:
+        entry = _es_tasks.get(task_id)
+        return dict(entry, progress=dict(entry["progress"])) if entry else None
+
+
+async def _refresh_task(task_id: str) -> dict | None:
+    """GET /_tasks/{id} and fold the result into the registry."""
+    resp = await _es_request("GET", f"/_tasks/{task_id}", "tasks.get", record_slow=False)
+    if resp.status_code == 404:  # finished and its result was not stored (or cleaned up)
+        with _es_tasks_lock:
+            entry = _es_tasks.get(task_id)
+            if entry is None:
+                return None
+            entry.update(status="lost", error="task not found in ES",
+                         finished_at=datetime.now(timezone.utc).isoformat(), finished_m=time.monotonic())
+        return _task_snapshot(task_id)
+    resp.raise_for_status()
+    data = resp.json()
+    task = data.get("task", {})
+    with _es_tasks_lock:
+        entry = _es_tasks.get(task_id)
+        if entry is None:
+            return None
+        entry["progress"] = _task_progress(data.get("response") or task.get("status") or {})
+        if "running_time_in_nanos" in task:
+            entry["running_ms"] = round(task["running_time_in_nanos"] / 1e6, 1)
+        if data.get("completed"):
+            response = data.get("response") or {}
+            error = data.get("error") or (response.get("failures") or [None])[0]
+            if response.get("canceled") or entry["status"] == "cancelling":
+                entry["status"] = "cancelled"
+            elif error:
+                entry["status"] = "failed"
+                entry["error"] = error.get("reason", str(error)) if isinstance(error, dict) else str(error)
+            else:
+                entry["status"] = "completed"
+            entry["finished_at"] = datetime.now(timezone.utc).isoformat()
+            entry["finished_m"] = time.monotonic()
+    return _task_snapshot(task_id)
+
+
+async def _poll_task(task_id: str) -> None:
+    """Poll until the task completes, following conflict retries. Transient poll errors are retried."""
+    delay = min(0.25, TASK_POLL_SECONDS)  # small jobs finish almost at once
+    with _span("es.task.poll", **{"es.task_id": task_id}):
+        while True:
+            await asyncio.sleep(delay)
+            delay = TASK_POLL_SECONDS
+            try:
+                entry = await _refresh_task(task_id)
+            except Exception as e:
+                logger.warning("task %s: poll failed: %s", task_id, e)
+                continue
+            if entry is None or entry["status"] in ("running", "cancelling"):
+                if entry is None:
+                    return
+                continue
+            logger.info("task %s (%s %s): %s — %s", task_id, entry["operation"],
+                        entry["index"], entry["status"], entry["progress"])
+            conflicts = entry["progress"]["version_conflicts"]
+            if entry["status"] != "completed" or not conflicts or entry["retries_left"] <= 0:
+                return
+            try:
+                task_id = await _start_es_task(
+                    entry["operation"], entry["index"], entry["body"], entry["description"],
+                    entry["tool"], entry["identity"], entry["retries_left"] - 1, retry_of=entry["task_id"],
+                )
+            except Exception as e:
+                logger.error("task %s: conflict retry failed: %s", entry["task_id"], e)
+                return
+            with _es_tasks_lock:
+                _es_tasks[entry["task_id"]]["retried_as"] = task_id
+            logger.info("task %s: retrying %d version conflicts as %s", entry["task_id"], conflicts, task_id)
+            delay = TASK_POLL_SECONDS  # let the conflicting writer finish
+
+
+async def _start_es_task(
+    operation: str,
+    index: str,
+    body: dict,
+    description: str,
+    tool: str,
+    identity: str,
+    retries_left: int,
+    retry_of: str | None = None,
+) -> str:
+    """POST the operation with wait_for_completion=false and register it. Returns the task id."""
+    params = {"wait_for_completion": "false", "slices": "auto", "conflicts": "proceed"}
+    resp = await _es_request(
+        "POST", _TASK_PATHS[operation].format(index=index), operation, index,
+        json.dumps(body), params=params,
+    )
+    resp.raise_for_status()
+    task_id = resp.json()["task"]
+
+    now_m = time.monotonic()
+    with _es_tasks_lock:
+        for key in [k for k, v in _es_tasks.items()
+                    if v.get("finished_m") and now_m - v["finished_m"] > TASK_RETENTION_SECONDS]:
+            del _es_tasks[key]
+        _es_tasks[task_id] = {
+            "task_id": task_id,
+            "operation": operation,
+            "index": index,
+            "description": description,
+            "tool": tool,
+            "identity": identity,
+            "submitted_at": datetime.now(timezone.utc).isoformat(),
+            "status": "running",
+            "progress": _task_progress({}),
+            "retry_of": retry_of,
+            "retries_left": retries_left,
+            "body": body,
+        }
+    return task_id
+
+
+def _task_public(entry: dict) -> dict:
+    """Registry entry without internal bookkeeping."""
+    return {k: v for k, v in entry.items() if k not in ("finished_m", "body", "retries_left")}
+
+
+def _task_chain(task_id: str) -> list[dict]:
+    """Snapshots of a task and its conflict retries, in order."""
+    chain = []
+    entry = _task_snapshot(task_id)
+    while entry and len(chain) <= TASK_CONFLICT_RETRIES:
+        chain.append(entry)
+        entry = _task_snapshot(entry["retried_as"]) if entry.get("retried_as") else None
+    return chain
+
+
+async def _submit_es_task(
+    operation: str,
+    index: str,
+    body: dict,
+    description: str = "",
+    conflict_retries: int = TASK_CONFLICT_RETRIES,
+) -> dict:
+    """Submit a long-running ES operation as a background task and start polling it.
+
+    Polling runs on the background loop, so tasks submitted from a scheduler
+    thread keep being tracked after its job returns. Version conflicts are
+    retried with the same body — callers must make it idempotent and narrow
+    (e.g. exclude already-updated documents from the query).
+
+    Waits up to TASK_INLINE_WAIT_SECONDS so small jobs return finished;
+    otherwise the returned entry is still running and its task_id can be
+    followed with manage_background_tasks.
+    """
+    _validate_index(index)
+    if operation == "reindex":
+        _validate_index(body["source"]["index"])
+        _validate_index(body["dest"]["index"])
+    _note_write(index)
+    task_id = await _start_es_task(
+        operation, index, body, description,
+        _current_tool.get(), _request_identity.get(), conflict_retries,
+    )
+    poller = asyncio.wrap_future(_run_in_background(_poll_task(task_id)))
+    try:
+        await asyncio.wait_for(asyncio.shield(poller), TASK_INLINE_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+    chain = _task_chain(task_id)
+    result = _task_public(chain[-1])
+    if len(chain) > 1:
+        result["attempts"] = [
+            {"task_id": t["task_id"], "status": t["status"], "updated": t["progress"]["updated"],
+             "version_conflicts": t["progress"]["version_conflicts"]}
+            for t in chain
+        ]
+    return result
+
+
+async def _cancel_es_task(task_id: str) -> dict | None:
+    """POST /_tasks/{id}/_cancel (cancels every slice). The poller records the outcome."""
+    with _es_tasks_lock:
+        entry = _es_tasks.get(task_id)
+        if entry is None or entry["status"] != "running":
+            return dict(entry) if entry else None
+        entry["status"] = "cancelling"
+        entry["retries_left"] = 0
+    resp = await _es_request("POST", f"/_tasks/{task_id}/_cancel", "tasks.cancel", record_slow=False)
+    resp.raise_for_status()
+    return _task_snapshot(task_id)
+
+
+# ─── Near-Duplicate Episodes (MinHash/LSH) ────────────────────
+# The same incident is often stored several times with small wording changes.
+# Each episode's raw_text gets a MinHash signature; LSH bands over the
+# signature find candidates in O(1), and a candidate whose estimated Jaccard
+# similarity clears DEDUP_THRESHOLD is merged into instead of re-indexed.
+# The index is per-process (warmed from recent episodes in the background
+# after startup), so replicas only catch duplicates they have seen.
+# Signatures are pure-Python CPU work and are computed in worker threads.
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.75"))  # estimated Jaccard
+DEDUP_NUM_PERM = 64
+DEDUP_BANDS = 16  # 16 bands x 4 rows: 0.5 similarity → 64% candidate rate, 0.75 → 99.8%
+DEDUP_SHINGLE_SIZE = 4  # characters; works for Korean as well as English
+DEDUP_MIN_LENGTH = 40  # shorter texts are too short to fingerprint reliably
+DEDUP_MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", "20000"))
+DEDUP_WARM_DAYS = int(os.getenv("DEDUP_WARM_DAYS", "7"))
+
+_DEDUP_PRIME = (1 << 61) - 1
+_dedup_rng = random.Random(0x5EED)
+_DEDUP_PERMS = [
+    (_dedup_rng.randrange(1, _DEDUP_PRIME), _dedup_rng.randrange(0, _DEDUP_PRIME))
+    for _ in range(DEDUP_NUM_PERM)
+]
+_DEDUP_ROWS = DEDUP_NUM_PERM // DEDUP_BANDS
+_DEDUP_PUNCT_RE = re.compile(r"[\W_]+")
+
+# doc_id → (category, signature, backing index), oldest first; (category, band, band hash) → doc_ids
+_dedup_signatures: "collections.OrderedDict[str, tuple[str, tuple[int, ...], str]]" = collections.OrderedDict()
+_dedup_buckets: dict[tuple[str, int, int], set[str]] = defaultdict(set)
+_dedup_lock = threading.Lock()
+
+
+def _minhash(text: str) -> tuple[int, ...] | None:
+    """MinHash signature over character shingles of normalized text. None if too short."""
+    norm = " ".join(_DEDUP_PUNCT_RE.sub(" ", text.lower()).split())
+    if len(norm) < DEDUP_MIN_LENGTH:
+        return None
+    hashes = {
+        int.from_bytes(hashlib.blake2b(norm[i:i + DEDUP_SHINGLE_SIZE].encode(), digest_size=8).digest(), "big")
+        for i in range(len(norm) - DEDUP_SHINGLE_SIZE + 1)
+    }
+    return tuple(min((a * h + b) % _DEDUP_PRIME for h in hashes) for a, b in _DEDUP_PERMS)
+
+
+def _lsh_keys(category: str | list[str], sig: tuple[int, ...]) -> list[tuple[str, int, int]]:
+    if isinstance(category, list):  # batch episode: only matches the same category set
+        category = ",".join(sorted(set(category)))
+    return [
+        (category, band, hash(sig[band * _DEDUP_ROWS:(band + 1) * _DEDUP_ROWS]))
+        for band in range(DEDUP_BANDS)
+    ]
+
+
+def _dedup_add(doc_id: str, category: str | list[str], sig: tuple[int, ...], index: str) -> None:
+    with _dedup_lock:
+        if doc_id in _dedup_signatures:
+            _dedup_signatures.move_to_end(doc_id)
+            return
+        _dedup_signatures[doc_id] = (category, sig, index)
+        for key in _lsh_keys(category, sig):
+            _dedup_buckets[key].add(doc_id)
+        while len(_dedup_signatures) > DEDUP_MAX_ENTRIES:
+            _dedup_discard_locked(next(iter(_dedup_signatures)))
+
+
+def _dedup_discard_locked(doc_id: str) -> None:
+    entry = _dedup_signatures.pop(doc_id, None)
+    if entry is None:
+        return
+    for key in _lsh_keys(entry[0], entry[1]):
+        bucket = _dedup_buckets.get(key)
+        if bucket is not None:
+            bucket.discard(doc_id)
+            if not bucket:
+                del _dedup_buckets[key]
+
+
+def _dedup_find(category: str | list[str], sig: tuple[int, ...]) -> tuple[str, str, float] | None:
+    """Best LSH candidate in the same category above DEDUP_THRESHOLD: (doc_id, index, similarity)."""
+    with _dedup_lock:
+        candidates = set()
+        for key in _lsh_keys(category, sig):
+            candidates |= _dedup_buckets.get(key, set())
+        best = None
+        for doc_id in candidates:
+            _, other, index = _dedup_signatures[doc_id]
+            similarity = sum(1 for x, y in zip(sig, other) if x == y) / DEDUP_NUM_PERM
+            if similarity >= DEDUP_THRESHOLD and (best is None or similarity > best[2]):
+                best = (doc_id, index, similarity)
+    return best
+
+
+DEDUP_WARM_PAGE_SIZE = 500
+
+
+def _dedup_register(hits: list[dict]) -> int:
+    """Compute and register signatures for a page of episode hits (worker thread)."""
+    loaded = 0
+    for hit in hits:
+        src = hit.get("_source", {})
+        sig = _minhash(src.get("raw_text") or "")
+        if sig:
+            _dedup_add(hit["_id"], src.get("category") or "", sig, hit["_index"])
+            loaded += 1
+    return loaded
+
+
+async def _dedup_warm() -> int:
+    """Load signatures of episodes from the last DEDUP_WARM_DAYS days."""
+    if not DEDUP_ENABLED:
+        return 0
+    loaded = 0
+    page: list[dict] = []
+    async for hit in _es_scan(
+        "episodic-memories", ["raw_text", "category"], page_size=DEDUP_WARM_PAGE_SIZE,
+        query={"range": {"timestamp": {"gte": f"now-{DEDUP_WARM_DAYS}d"}}},
+    ):
+        page.append(hit)
+        if len(page) >= DEDUP_WARM_PAGE_SIZE:
+            loaded += await asyncio.to_thread(_dedup_register, page)
+            page = []
+    if page:
+        loaded += await asyncio.to_thread(_dedup_register, page)
+    logger.info("dedup: warmed %d episode signatures", loaded)
+    return loaded
+
+
+async def _merge_duplicate_episode(
+    raw_text: str, category: str | list[str], importance: float, refs: list[str], now: str,
+) -> tuple[dict | None, tuple[int, ...] | None]:
+    """Merge into a near-duplicate episode if there is one.
+
+    Merging keeps only the stored text, so a near-duplicate that states a
+    value the stored episode lacks ("timeout 30s" vs "timeout 60s") is not
+    merged — it is a newer fact, not a repeat.
+
+    Returns (result, signature): result is {"status": "merged", ...} when
+    merged, else None and the caller indexes a new episode (then registers
+    the signature with _dedup_add).
+    """
+    sig = await asyncio.to_thread(_minhash, raw_text) if DEDUP_ENABLED else None
+    if sig is None:
+        return None, None
+    match = _dedup_find(category, sig)
+    if match is None:
+        return None, sig
+    doc_id, index, similarity = match
+
+    for _ in range(3):  # optimistic concurrency: retry on version conflict
+        existing = await _es_get_document(index, doc_id)
+        if existing is None:  # deleted by ILM or rollback — forget it
+            with _dedup_lock:
+                _dedup_discard_locked(doc_id)
+            return None, sig
+        src = existing.get("_source", {})
+        new_values = _stated_values(raw_text) - _stated_values(src.get("raw_text") or "")
+        if new_values:
+            logger.info("dedup: %s is similar but states new values %s, indexing new episode",
+                        doc_id, sorted(new_values)[:5])
+            return None, sig
+        merged_refs = list(dict.fromkeys([*(src.get("external_refs") or []), *refs]))[:MAX_EXTERNAL_REFS]
+        status = await _es_update_document(index, doc_id, {
+            "importance": max(src.get("importance") or 0.0, importance),
+            "external_refs": merged_refs,
+            "duplicate_count": (src.get("duplicate_count") or 0) + 1,
+            "last_seen": now,
+        }, if_seq_no=existing["_seq_no"], if_primary_term=existing["_primary_term"])
+        if status == 409:
+            continue
+        if status >= 300:
+            logger.warning("dedup: merge into %s failed (HTTP %d), indexing new episode", doc_id, status)
+            return None, sig
+        _dedup_add(doc_id, category, sig, index)
+        return {"status": "merged", "id": doc_id, "similarity": round(similarity, 3)}, sig
+    logger.warning("dedup: merge into %s kept conflicting, indexing new episode", doc_id)
+    return None, sig
+
+
+def _episode_doc(raw_text: str, category: str | list[str], importance: float, refs: list[str], now: str) -> dict:
+    doc = {
+        "raw_text": raw_text,
+        "content": raw_text,
+        "timestamp": now,
+        "importance": importance,
+        "category": category,
+        "source_type": "conversation",
+        "reflected": False,
+    }
+    if refs:
+        doc["external_refs"] = refs
+    return doc
+
+
+async def _write_episode(raw_text: str, category: str, importance: float, refs: list[str], now: str) -> dict:
+    """Index a conversation episode, or merge it into a near-duplicate one."""
+    try:
+        merged, sig = await _merge_duplicate_episode(raw_text, category, importance, refs, now)
+    except Exception as e:
+        logger.warning("dedup: lookup failed, indexing new episode: %s", e)
+        merged, sig = None, None
+    if merged:
+        return merged
+    r = await _index_document("episodic-memories", _episode_doc(raw_text, category, importance, refs, now))
+    if sig and r.get("_id"):
+        _dedup_add(r["_id"], category, sig, r.get("_index", "episodic-memories"))
+    return {"status": "ok", "id": r.get("_id")}
+
+
+# ─── Entity Catalog (name canonicalization) ──────────────────
+# "payment-service", "payment_service" and "Payment Service" are one entity.
+# The catalog maps every known spelling (alias) of an entity or attribute
+# to a canonical name, kept exactly as first written (separators included)
+# so existing documents keep matching. Only spellings that differ in case
+# or separators are aliased automatically (flagged for review); look-alikes
+# found through a bounded trigram index and token shapes (plurals,
+# abbreviations, typos within a small edit distance) are only suggested, for a curator to merge
+# with manage_entity_catalog.
+#
+# Entries persist to entity-catalog (one doc per canonical) with
+# read-modify-write under if_seq_no, so replicas adding aliases to the same
+# entry merge instead of overwriting each other. A call's new names are
+# written with one _mget and one _bulk; conflicting or failed writes are
+# kept and replayed on the next reload. An empty catalog is seeded from
+# semantic-memories by the one replica holding the seed lease. Resolution is
+# CPU work under a threading lock, so it runs in a worker thread.
+
+CATALOG_INDEX = "entity-catalog"
+CATALOG_ENABLED = os.getenv("CATALOG_ENABLED", "true").lower() == "true"
+CATALOG_REFRESH_SECONDS = int(os.getenv("CATALOG_REFRESH_SECONDS", "300"))  # reload (other replicas' edits)
+CATALOG_SEED_RETRY_SECONDS = 10  # while another replica seeds, names pass through unchanged
+CATALOG_MAX_EDIT_DISTANCE = 2
+CATALOG_NGRAM_THRESHOLD = 0.6
+# Trigrams shared by more keys than this ("ser", "ice", ...) don't nominate candidates
+CATALOG_GRAM_POSTING_MAX = int(os.getenv("CATALOG_GRAM_POSTING_MAX", "256"))
+CATALOG_CANDIDATES_MAX = 32  # most-overlapping keys scored per lookup
+CATALOG_WRITE_RETRIES = 5
+CATALOG_LIST_LIMIT = 200
+CATALOG_KINDS = ("entity", "attribute")
+CATALOG_SEED_LEASE = "entity_catalog_seed"
+
+_CATALOG_SEP_RE = re.compile(r"[\s_./-]+")
+_CATALOG_FIELDS = ["kind", "canonical", "aliases", "review", "similar", "source", "created_at", "updated_at"]
+_CATALOG_LISTS = ("aliases", "review", "similar")
+
+# kind → canonical → entry; kind → key → canonical; kind → folded key → canonical
+_catalog: dict[str, dict[str, dict]] = {k: {} for k in CATALOG_KINDS}
+_catalog_alias: dict[str, dict[str, str]] = {k: {} for k in CATALOG_KINDS}
+_catalog_folded: dict[str, dict[str, str]] = {k: {} for k in CATALOG_KINDS}
+_catalog_shapes: dict[str, dict[str, set[str]]] = {k: defaultdict(set) for k in CATALOG_KINDS}
+_catalog_grams: dict[str, dict[str, set[str]]] = {k: defaultdict(set) for k in CATALOG_KINDS}
+_catalog_key_grams: dict[str, dict[str, frozenset[str]]] = {k: {} for k in CATALOG_KINDS}
+_catalog_lock = threading.Lock()
+_catalog_state: dict = {"loaded_m": None, "loading": False, "retry_m": 0.0}
+# (kind, canonical, mutate) writes that failed to persist; replayed on reload
+_catalog_pending: list[tuple[str, str, object]] = []
+
+
+def _catalog_key(name: str) -> str:
+    """Lookup key: the name as written, lowercased."""
+    return name.strip().lower()
+
+
+def _catalog_fold(key: str) -> str:
+    """Separator-insensitive form: whitespace/_/./- runs → '-'."""
+    return _CATALOG_SEP_RE.sub("-", key).strip("-")
+
+
+def _trigrams(key: str) -> frozenset[str]:
+    padded = f"^{key}$"
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _edit_distance(a: str, b: str, max_dist: int) -> int:
+    """Levenshtein distance, or max_dist + 1 once it exceeds max_dist (cells within the band only)."""
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+    while a and b and a[0] == b[0]:  # shared prefix/suffix don't change the distance
+        a, b = a[1:], b[1:]
+    while a and b and a[-1] == b[-1]:
+        a, b = a[:-1], b[:-1]
+    over = max_dist + 1
+    prev = {j: j for j in range(min(len(b), max_dist) + 1)}
+    for i in range(1, len(a) + 1):
+        row = {}
+        for j in range(max(0, i - max_dist), min(len(b), i + max_dist) + 1):
+            if j == 0:
+                row[j] = i
+                continue
+            row[j] = min(row.get(j - 1, over) + 1, prev.get(j, over) + 1,
+                         prev.get(j - 1, over) + (a[i - 1] != b[j - 1]))
+        if min(row.values()) > max_dist:
+            return over
+        prev = row
+    return min(prev.get(len(b), over), over)
+
+
+def _token_shape(key: str) -> str:
+    """Token count and initials ('payment-svc' → 'ps'); plural/abbreviation variants share it."""
+    return "".join(t[0] for t in _catalog_fold(key).split("-") if t)
+
+
+def _is_abbreviation(short: str, full: str) -> bool:
+    """'svc' → 'service', 'cfg' → 'config': same first letter, in-order subsequence."""
+    if len(short) < 3 or len(full) < len(short) + 2 or short[0] != full[0]:
+        return False
+    it = iter(full)
+    return all(ch in it for ch in short)
+
+
+def _likely_variant(a: str, b: str) -> bool:
+    """Same tokens up to plural/abbreviation (ranks suggestions; never auto-aliased)."""
+    ta, tb = _catalog_fold(a).split("-"), _catalog_fold(b).split("-")
+    if len(ta) != len(tb):
+        return False
+    for x, y in zip(ta, tb):
+        if x == y:
+            continue
+        if any(ch.isdigit() for ch in x + y):  # v1 vs v2, pool-20 vs pool-50
+            return False
+        if x.rstrip("s") == y.rstrip("s"):
+            continue
+        short, full = sorted((x, y), key=len)
+        if not _is_abbreviation(short, full):
+            return False
+    return True
+
+
+def _catalog_index_key_locked(kind: str, key: str, canonical: str) -> None:
+    _catalog_alias[kind][key] = canonical
+    _catalog_folded[kind].setdefault(_catalog_fold(key), canonical)
+    _catalog_shapes[kind][_token_shape(key)].add(key)
+    grams = _trigrams(key)
+    _catalog_key_grams[kind][key] = grams
+    for gram in grams:
+        _catalog_grams[kind][gram].add(key)
+
+
+def _catalog_store_locked(kind: str, entry: dict) -> None:
+    """Insert or replace an entry and index its keys (additions only; see _catalog_rebuild_locked)."""
+    for field in _CATALOG_LISTS:
+        entry.setdefault(field, [])
+    _catalog[kind][entry["canonical"]] = entry
+    for key in [entry["canonical"], *entry["aliases"]]:
+        _catalog_index_key_locked(kind, key, entry["canonical"])
+
+
+def _catalog_rebuild_locked(kind: str) -> None:
+    """Rebuild the lookup structures after entries were removed or moved."""
+    for table in (_catalog_alias, _catalog_folded, _catalog_shapes, _catalog_grams, _catalog_key_grams):
+        table[kind].clear()
+    for entry in _catalog[kind].values():
+        for key in [entry["canonical"], *entry["aliases"]]:
+            _catalog_index_key_locked(kind, key, entry["canonical"])
+
+
+def _catalog_candidates_locked(kind: str, key: str) -> list[dict]:
+    """Canonical names that look like key, best first (likely = plural/abbreviation variant).
+
+    Candidates come from the trigram postings (only keys sharing enough
+    trigrams to pass the similarity or edit-distance bar) and from keys with
+    the same token shape; only the CATALOG_CANDIDATES_MAX most overlapping
+    are scored.
+    """
+    max_dist = min(CATALOG_MAX_EDIT_DISTANCE, max(1, len(key) // 6))
+    grams = _trigrams(key)
+    shared: dict[str, int] = defaultdict(int)
+    skipped = 0
+    for gram in grams:
+        posting = _catalog_grams[kind].get(gram)
+        if posting and len(posting) > CATALOG_GRAM_POSTING_MAX:
+            skipped += 1
+        elif posting:
+            for other in posting:
+                shared[other] += 1
+    # one edit breaks at most 3 trigrams; Jaccard ≥ t needs ≥ t·|grams| shared
+    near = len(grams) - 3 * max_dist - skipped
+    needed = min(CATALOG_NGRAM_THRESHOLD * len(grams) - skipped, near)
+    found = {other for other, n in shared.items() if n >= needed}
+    shape = _catalog_shapes[kind].get(_token_shape(key), ())
+    if len(shape) <= CATALOG_GRAM_POSTING_MAX:
+        found.update(shape)
+    found.discard(key)
+    found = heapq.nlargest(CATALOG_CANDIDATES_MAX, found, key=lambda other: shared.get(other, 0))
+
+    has_digit = any(ch.isdigit() for ch in key)
+    best: dict[str, dict] = {}
+    for other in found:
+        if any(ch.isdigit() for ch in other) != has_digit:
+            continue
+        other_grams = _catalog_key_grams[kind][other]
+        similarity = len(grams & other_grams) / len(grams | other_grams)
+        distance = _edit_distance(key, other, max_dist) if shared.get(other, 0) >= near else max_dist + 1
+        likely = _likely_variant(key, other)
+        if distance > max_dist and similarity < CATALOG_NGRAM_THRESHOLD and not likely:
+            continue
+        cand = {"key": other, "ngram": round(similarity, 2), "canonical": _catalog_alias[kind][other], "likely": likely}
+        if distance <= max_dist:
+            cand["distance"] = distance
+        rank = (likely, similarity, -cand.get("distance", 9))
+        prev = best.get(cand["canonical"])
+        if prev is None or rank > prev["rank"]:
+            best[cand["canonical"]] = dict(cand, rank=rank)
+    ranked = sorted(best.values(), key=lambda c: c["rank"], reverse=True)
+    return [{k: v for k, v in c.items() if k != "rank"} for c in ranked]
+
+
+# ─── Entity Catalog: persistence ───
+
+def _catalog_doc_id(kind: str, canonical: str) -> str:
+    return hashlib.sha1(f"{kind}\x00{canonical}".encode()).hexdigest()
+
+
+def _catalog_upsert(entry: dict):
+    """Mutation: create entry, or union its lists into the stored one."""
+    snapshot = {k: list(v) if k in _CATALOG_LISTS else v for k, v in entry.items()}
+
+    def mutate(doc: dict | None) -> dict:
+        if doc is None:
+            return dict(snapshot)
+        for field in _CATALOG_LISTS:
+            doc[field] = doc.get(field, []) + [x for x in snapshot[field] if x not in doc.get(field, [])]
+        doc["updated_at"] = max(doc.get("updated_at", ""), snapshot["updated_at"])
+        return doc
+    return mutate
+
+
+def _catalog_add_alias(key: str, entry: dict, now: str):
+    """Mutation: add one alias (flagged for review); creates the entry if it isn't stored yet."""
+    create = _catalog_upsert(entry)
+
+    def mutate(doc: dict | None) -> dict:
+        if doc is None:
+            return create(None)
+        for field in ("aliases", "review"):
+            if key not in doc.setdefault(field, []):
+                doc[field].append(key)
+        doc["updated_at"] = now
+        return doc
+    return mutate
+
+
+def _catalog_checked(source: object, kind: str | None = None, canonical: str | None = None) -> dict | None:
+    """A stored catalog doc if it is well-formed (and is the entry asked for), else None."""
+    if (
+        isinstance(source, dict)
+        and source.get("kind") in CATALOG_KINDS
+        and isinstance(source.get("canonical"), str)
+        and (kind is None or source["kind"] == kind)
+        and (canonical is None or source["canonical"] == canonical)
+        and all(isinstance(source.get(field, []), list) for field in _CATALOG_LISTS)
+    ):
+        return source
+    logger.warning("catalog: ignoring malformed entry %s/%s", kind or "?", canonical or "?")
+    return None
+
+
+async def _catalog_write(kind: str, canonical: str, mutate) -> dict | None:
+    """Read-modify-write one entry under if_seq_no, retrying on conflict.
+
+    mutate(stored doc or None) returns the doc to store (None = nothing to write).
+    A malformed stored doc counts as absent and is overwritten. The stored
+    result replaces the in-memory entry.
+    """
+    doc_id = _catalog_doc_id(kind, canonical)
+    for _ in range(CATALOG_WRITE_RETRIES):
+        current = await _es_get_document(CATALOG_INDEX, doc_id)
+        doc = mutate(_catalog_checked(current["_source"], kind, canonical) if current else None)
+        if doc is None:
+            return None
+        if current is None:
+            status = await _es_put_document(CATALOG_INDEX, doc_id, doc, create=True)
+        else:
+            status = await _es_put_document(
+                CATALOG_INDEX, doc_id, doc,
+                if_seq_no=current["_seq_no"], if_primary_term=current["_primary_term"],
+            )
+        if status in (200, 201):
+            with _catalog_lock:
+                _catalog_store_locked(kind, doc)
+            return doc
+        if status != 409:
+            raise RuntimeError(f"catalog write for {kind} '{canonical}' failed HTTP {status}")
+    raise RuntimeError(f"catalog write for {kind} '{canonical}' kept conflicting")
+
+
+async def _catalog_persist(writes: list[tuple[str, str, object]]) -> int:
+    """Persist writes with one _mget and one _bulk (if_seq_no per entry).
+
+    Writes to the same entry are applied in order. Conflicts and retryable
+    failures are queued and replayed on the next reload; other rejections
+    are dropped with a warning. Returns the number of entries not persisted.
+    """
+    grouped: dict[tuple[str, str], list] = {}
+    for kind, canonical, mutate in writes:
+        grouped.setdefault((kind, canonical), []).append(mutate)
+    if not grouped:
+        return 0
+
+    def requeue(keys) -> None:
+        with _catalog_lock:
+            _catalog_pending.extend((kind, canonical, m) for kind, canonical in keys for m in grouped[(kind, canonical)])
+
+    doc_ids = {key: _catalog_doc_id(*key) for key in grouped}
+    try:
+        stored = await _es_mget_documents(CATALOG_INDEX, list(doc_ids.values()))
+    except Exception as e:
+        logger.warning("catalog: reading %d entries failed (will retry on reload): %s", len(grouped), e)
+        requeue(grouped)
+        return len(grouped)
+
+    keys, actions = [], []
+    for key, mutations in grouped.items():
+        current = stored.get(doc_ids[key])
+        doc = _catalog_checked(current["_source"], *key) if current else None
+        if doc is not None:
+            doc = copy.deepcopy(doc)
+        for mutate in mutations:
+            doc = mutate(doc)
+        if doc is None:
+            continue
+        meta = {"_index": CATALOG_INDEX, "_id": doc_ids[key]}
+        if current is None:
+            actions.append(({"create": meta}, doc))
+        else:  # also overwrites a malformed doc, unless it changed meanwhile
+            meta.update(if_seq_no=current["_seq_no"], if_primary_term=current["_primary_term"])
+            actions.append(({"index": meta}, doc))
+        keys.append(key)
+    if not actions:
+        return 0
+
+    try:
+        report = await _bulk_write(actions)
+    except Exception as e:
+        logger.warning("catalog: persisting %d entries failed (will retry on reload): %s", len(keys), e)
+        requeue(keys)
+        return len(keys)
+    failed = {f["position"]: f for f in report["failures"]}
+    retry = []
+    with _catalog_lock:
+        for pos, key in enumerate(keys):
+            if pos not in failed:
+                _catalog_store_locked(key[0], actions[pos][1])
+    for pos, failure in failed.items():
+        if failure["status"] == 409 or failure["status"] in BULK_RETRY_STATUSES or failure["status"] == 0:
+            retry.append(keys[pos])
+        else:
+            logger.warning("catalog: %s '%s' rejected (HTTP %d %s), dropped",
+                           *keys[pos], failure["status"], failure["error"])
+    if retry:
+        logger.warning("catalog: %d entries conflicted or failed, will retry on reload", len(retry))
+        requeue(retry)
+    return len(failed)
+
+
+# ─── Entity Catalog: resolution / loading ───
+
+def _catalog_resolve_locked(kind: str, name: str, source: str, now: str) -> tuple[str, dict, tuple | None]:
+    """Resolve a name. Returns (canonical, note, write to persist or None).
+
+    note["match"]: exact | alias | variant (new alias, case/separators only) | new
+    New names carry note["suggested"]: look-alike canonicals awaiting review.
+    Seeding never aliases: every existing spelling becomes its own entry.
+    """
+    key = _catalog_key(name)
+    canonical = _catalog_alias[kind].get(key)
+    if canonical is not None:
+        return canonical, {"match": "exact" if canonical == key else "alias"}, None
+
+    target = _catalog_folded[kind].get(_catalog_fold(key))
+    if target is not None and source != "seed":
+        entry = _catalog[kind][target]
+        entry["aliases"].append(key)
+        entry["review"].append(key)
+        entry["updated_at"] = now
+        _catalog_index_key_locked(kind, key, target)
+        return target, {"match": "variant"}, (kind, target, _catalog_add_alias(key, entry, now))
+
+    similar = [target] if target else []
+    similar += [c["canonical"] for c in _catalog_candidates_locked(kind, key) if c["canonical"] not in similar]
+    entry = {
+        "kind": kind, "canonical": key, "aliases": [], "review": [], "similar": similar[:3],
+        "source": source, "created_at": now, "updated_at": now,
+    }
+    _catalog_store_locked(kind, entry)
+    return key, {"match": "new", "suggested": entry["similar"]}, (kind, key, _catalog_upsert(entry))
+
+
+def _catalog_resolve_pairs(pairs: list[tuple[str, str]], now: str) -> tuple[list[tuple[str, str]], list[dict], list]:
+    """Resolve (entity, attribute) pairs (worker thread). Returns pairs, notes, writes."""
+    resolved, notes, writes = [], [], []
+    with _catalog_lock:
+        for pair in pairs:
+            out = []
+            for kind, name in zip(CATALOG_KINDS, pair):
+                canonical, note, write = _catalog_resolve_locked(kind, name, "remember", now)
+                if write is not None:
+                    writes.append(write)
+                if canonical != name or note["match"] == "variant" or note.get("suggested"):
+                    notes.append({"kind": kind, "input": name, "canonical": canonical,
+                                  **{k: v for k, v in note.items() if v}})
+                out.append(canonical)
+            resolved.append(tuple(out))
+    return resolved, notes, writes
+
+
+def _catalog_replace(entries: list[dict]) -> None:
+    """Swap in entries loaded from ES (worker thread), re-applying writes still pending."""
+    with _catalog_lock:
+        for kind in CATALOG_KINDS:
+            _catalog[kind].clear()
+        for entry in filter(_catalog_checked, entries):
+            for field in _CATALOG_LISTS:
+                entry.setdefault(field, [])
+            _catalog[entry["kind"]][entry["canonical"]] = entry
+        for kind, canonical, mutate in _catalog_pending:
+            stored = _catalog[kind].get(canonical)
+            doc = mutate(copy.deepcopy(stored) if stored else None)
+            if doc is not None:
+                _catalog[kind][canonical] = doc
+        for kind in CATALOG_KINDS:
+            _catalog_rebuild_locked(kind)
+
+
+def _catalog_seed_entries(names: dict[str, list[str]], now: str) -> list[dict]:
+    """Catalog entries for existing names, most used first (worker thread)."""
+    seeded = []
+    with _catalog_lock:
+        for kind, keys in names.items():
+            for name in keys:
+                canonical, note, _ = _catalog_resolve_locked(kind, name, "seed", now)
+                if note["match"] == "new":
+                    seeded.append(_catalog[kind][canonical])
+    return seeded
+
+
+async def _catalog_seed() -> int:
+    """Build the catalog from semantic-memories (caller holds the seed lease)."""
+    names = {}
+    for kind in CATALOG_KINDS:
+        buckets = await _es_composite("semantic-memories", kind, {}, fresh=True)
+        names[kind] = [str(b["key"]) for b in sorted(buckets, key=lambda b: -b["doc_count"]) if b["key"]]
+    seeded = await asyncio.to_thread(_catalog_seed_entries, names, datetime.now(timezone.utc).isoformat())
+    report = await _bulk_write([
+        ({"create": {"_index": CATALOG_INDEX, "_id": _catalog_doc_id(e["kind"], e["canonical"])}}, e)
+        for e in seeded
+    ])
+    # 409 = created concurrently (e.g. by a remember call); picked up on the next reload
+    report["failures"] = [f for f in report["failures"] if f["status"] != 409]
+    report["failed"] = len(report["failures"])
+    for error in _bulk_error_summary("catalog seed", report):
+        logger.warning("catalog: %s", error)
+    return report["succeeded"]
+
+
+async def _catalog_ensure_loaded() -> bool:
+    """Make the catalog usable; False while it isn't (names then pass through unchanged).
+
+    Reloads every CATALOG_REFRESH_SECONDS. One caller reloads at a time; the
+    others keep using the current copy.
+    """
+    now_m = time.monotonic()
+    with _catalog_lock:
+        loaded = _catalog_state["loaded_m"]
+        if loaded is not None and now_m - loaded < CATALOG_REFRESH_SECONDS:
+            return True
+        if _catalog_state["loading"] or (loaded is None and now_m < _catalog_state["retry_m"]):
+            return loaded is not None
+        _catalog_state["loading"] = True
+        pending = list(_catalog_pending)
+        _catalog_pending.clear()
+    try:
+        await _catalog_persist(pending)
+        entries = []
+        try:
+            async for hit in _es_scan(CATALOG_INDEX, _CATALOG_FIELDS, page_size=500, fresh=True):
+                entries.append(hit["_source"])
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+        if entries:
+            await asyncio.to_thread(_catalog_replace, entries)
+        else:
+            async with _job_lease(CATALOG_SEED_LEASE) as held:
+                if not held:  # another replica is seeding
+                    with _catalog_lock:
+                        _catalog_state["retry_m"] = time.monotonic() + CATALOG_SEED_RETRY_SECONDS
+                    return loaded is not None
+                seeded = await _catalog_seed()
+            logger.info("catalog: seeded %d entries from semantic-memories", seeded)
+        with _catalog_lock:
+            _catalog_state["loaded_m"] = time.monotonic()
+        return True
+    finally:
+        with _catalog_lock:
+            _catalog_state["loading"] = False
+
+
+async def _canonicalize(pairs: list[tuple[str, str]]) -> tuple[list[tuple[str, str]], list[dict]]:
+    """Resolve (entity, attribute) pairs to canonical names.
+
+    Returns the canonical pairs and a note per name that changed, was aliased
+    or has look-alikes. Falls back to the input names while the catalog is
+    unavailable.
+    """
+    if not CATALOG_ENABLED:
+        return pairs, []
+    try:
+        ready = await _catalog_ensure_loaded()
+    except Exception as e:
+        logger.warning("catalog: load failed, storing names as given: %s", e)
+        return pairs, []
+    if not ready:
+        return pairs, []
+    now = datetime.now(timezone.utc).isoformat()
+    resolved, notes, writes = await asyncio.to_thread(_catalog_resolve_pairs, pairs, now)
+    await _catalog_persist(writes)
+    return resolved, notes
 
 
 # ─── MCP Tool 1: remember_memory ───────────────────────
 
 @mcp.tool()
+@_admission
 async def remember_memory(
     raw_text: str,
     entity: str,
@@ -234,30 +2158,21 @@ async def remember_memory(
     # Validate input lengths
     if len(raw_text) > MAX_RAW_TEXT_LENGTH:
         return json.dumps({"error": f"raw_text exceeds {MAX_RAW_TEXT_LENGTH} characters"})
-    if len(entity) > MAX_FIELD_LENGTH or len(attribute) > MAX_FIELD_LENGTH:
-        return json.dumps({"error": f"entity/attribute exceeds {MAX_FIELD_LENGTH} characters"})
-    if len(value) > MAX_VALUE_LENGTH:
-        return json.dumps({"error": f"value exceeds {MAX_VALUE_LENGTH} characters"})
-    if len(category) > MAX_FIELD_LENGTH:
-        return json.dumps({"error": f"category exceeds {MAX_FIELD_LENGTH} characters"})
+    error = _triple_error(entity, attribute, value, category)
+    if error:
+        return json.dumps({"error": error})
     if len(refs_list) > MAX_EXTERNAL_REFS:
         return json.dumps({"error": f"external_refs exceeds {MAX_EXTERNAL_REFS} items"})
 
-    # 1) episodic-memories — raw experience record
+    # Collapse naming variants (Payment_Service → payment-service) via the entity catalog
+    given_entity, given_attribute = entity, attribute
+    [(entity, attribute)], canonicalized = await _canonicalize([(entity, attribute)])
+
+    # 1) episodic-memories — raw experience record (merged into a near-duplicate if one exists)
     try:
-        ep_doc = {
-            "raw_text": raw_text,
-            "content": raw_text,
-            "timestamp": now,
-            "importance": _parse_confidence(confidence),
-            "category": category,
-            "source_type": "conversation",
-            "reflected": False,
-        }
-        if refs_list:
-            ep_doc["external_refs"] = refs_list
-        r = await _index_document("episodic-memories", ep_doc)
-        results["episodic"] = {"status": "ok", "id": r.get("_id")}
+        results["episodic"] = await _write_episode(
+            raw_text, category, _parse_confidence(confidence), refs_list, now,
+        )
     except Exception as e:
         logger.error("episodic-memories write failed: %s", e)
         results["episodic"] = {"status": "error", "message": _safe_error(e)}
@@ -275,6 +2190,10 @@ async def remember_memory(
             "last_updated": now,
             "update_count": 1,
         }
+        if entity != given_entity:
+            sem_doc["entity_alias"] = given_entity
+        if attribute != given_attribute:
+            sem_doc["attribute_alias"] = given_attribute
         if refs_list:
             sem_doc["external_refs"] = refs_list
         r = await _index_document("semantic-memories", sem_doc)
@@ -294,10 +2213,12 @@ async def remember_memory(
         logger.error("knowledge-domains write failed: %s", e)
         results["domain"] = {"status": "error", "message": _safe_error(e)}
 
-    ok_count = sum(1 for v in results.values() if v["status"] == "ok")
+    ok_count = sum(1 for v in results.values() if v["status"] in ("ok", "merged"))
     summary = f"Saved successfully ({ok_count}/3 indices)"
+    if results["episodic"]["status"] == "merged":
+        summary += " — episode merged into near-duplicate"
     if ok_count < 3:
-        failed = [k for k, v in results.items() if v["status"] != "ok"]
+        failed = [k for k, v in results.items() if v["status"] not in ("ok", "merged")]
         summary += f" — failed: {', '.join(failed)}"
 
     # 4) Audit log entry (memory-access-log)
@@ -313,30 +2234,583 @@ async def remember_memory(
     except Exception as e:
         logger.error("remember: audit log write failed: %s", e)
 
-    return json.dumps({"summary": summary, "details": results}, ensure_ascii=False)
+    response = {"summary": summary, "details": results}
+    if canonicalized:
+        response["canonicalized"] = canonicalized
+    return json.dumps(response, ensure_ascii=False)
+
+
+# ─── MCP Tool 1b: remember_memories_batch ─────────────────────
+
+@mcp.tool()
+@_admission
+async def remember_memories_batch(
+    raw_text: str,
+    triples: list[dict],
+    confidence: str = "",
+    category: str = "",
+    external_refs: str = "",
+) -> str:
+    """Store many SPO triples from one conversation in a single call.
+
+    Use instead of repeated remember_memory calls (e.g. postmortem wrap-up).
+    All triples are validated before anything is written; one episode is
+    written for the batch (tagged with every category), one staging update
+    per category and one semantic memory per triple. An episode that
+    near-duplicates an existing one is merged into it.
+
+    Args:
+        raw_text: Original text shared by all triples (episodic memory)
+        triples: List of {"entity", "attribute", "value"} objects; each may also set
+            "confidence" and "category" to override the batch defaults
+        confidence: Default confidence level (0.0~1.0)
+        category: Default category (e.g., database, kubernetes)
+        external_refs: External reference URLs shared by all triples (comma-separated)
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    refs_list = [r.strip() for r in external_refs.split(",") if r.strip()] if external_refs else []
+
+    # Validate everything up front — nothing is written if any triple is invalid
+    if len(raw_text) > MAX_RAW_TEXT_LENGTH:
+        return json.dumps({"error": f"raw_text exceeds {MAX_RAW_TEXT_LENGTH} characters"})
+    if len(refs_list) > MAX_EXTERNAL_REFS:
+        return json.dumps({"error": f"external_refs exceeds {MAX_EXTERNAL_REFS} items"})
+    if not triples:
+        return json.dumps({"error": "triples is empty"})
+    if len(triples) > MAX_BATCH_TRIPLES:
+        return json.dumps({"error": f"triples exceeds {MAX_BATCH_TRIPLES} items"})
+
+    normalized = []
+    invalid = []
+    for pos, t in enumerate(triples):
+        if not isinstance(t, dict):
+            invalid.append({"position": pos, "error": "triple must be an object"})
+            continue
+        item = {
+            "entity": str(t.get("entity", "")).strip().lower(),
+            "attribute": str(t.get("attribute", "")).strip().lower(),
+            "value": str(t.get("value", "")),
+            "category": str(t.get("category") or category).strip().lower(),
+            "confidence": _parse_confidence(str(t.get("confidence") or confidence)),
+        }
+        if not item["entity"] or not item["attribute"] or not item["category"]:
+            error = "entity, attribute and category are required"
+        else:
+            error = _triple_error(item["entity"], item["attribute"], item["value"], item["category"])
+        if error:
+            invalid.append({"position": pos, "error": error})
+        normalized.append(item)
+    if invalid:
+        return json.dumps({
+            "error": f"{len(invalid)} of {len(triples)} triples invalid — nothing written",
+            "invalid": invalid,
+        }, ensure_ascii=False)
+
+    # Collapse naming variants via the entity catalog (one lookup for the whole batch)
+    canonical_pairs, canonicalized = await _canonicalize(
+        [(item["entity"], item["attribute"]) for item in normalized]
+    )
+
+    # Build one bulk request: semantic per triple, one episode, staging per category
+    by_category: dict[str, list[int]] = defaultdict(list)
+    actions = []
+    for pos, item in enumerate(normalized):
+        by_category[item["category"]].append(pos)
+        sem_doc = {
+            "content": f"{item['entity']} {item['attribute']} {item['value']}",
+            "entity": item["entity"],
+            "attribute": item["attribute"],
+            "value": item["value"],
+            "confidence": item["confidence"],
+            "category": item["category"],
+            "first_observed": now,
+            "last_updated": now,
+            "update_count": 1,
+        }
+        entity, attribute = canonical_pairs[pos]
+        if entity != item["entity"]:
+            sem_doc.update(entity=entity, entity_alias=item["entity"])
+        if attribute != item["attribute"]:
+            sem_doc.update(attribute=attribute, attribute_alias=item["attribute"])
+        sem_doc["content"] = f"{entity} {attribute} {item['value']}"
+        item["entity"], item["attribute"] = entity, attribute
+        if refs_list:
+            sem_doc["external_refs"] = refs_list
+        actions.append(({"index": {"_index": "semantic-memories"}}, sem_doc))
+
+    # One episode carries raw_text for every category (embedded once); an
+    # episode that near-duplicates an existing one is merged instead of bulk-indexed
+    cats = list(by_category)
+    episode_category = cats[0] if len(cats) == 1 else cats
+    importance = max(item["confidence"] for item in normalized)
+    try:
+        merged, sig = await _merge_duplicate_episode(raw_text, episode_category, importance, refs_list, now)
+    except Exception as e:
+        logger.warning("dedup: lookup failed, indexing new episode: %s", e)
+        merged, sig = None, None
+    episode_pos = None
+    if not merged:
+        episode_pos = len(actions)
+        actions.append((
+            {"index": {"_index": "episodic-memories"}},
+            _episode_doc(raw_text, episode_category, importance, refs_list, now),
+        ))
+    domain_positions: dict[str, int] = {}
+    for cat in cats:
+        domain_positions[cat] = len(actions)
+        actions.append(({"index": {"_index": "knowledge-domains-staging"}}, {
+            "domain": cat,
+            "last_updated": now,
+        }))
+
+    try:
+        report = await _bulk_write(actions)
+    except Exception as e:
+        logger.error("remember_batch: bulk write failed: %s", e)
+        return json.dumps({"error": f"bulk write failed: {_safe_error(e)}"})
+
+    def _result(pos: int) -> dict:
+        entry = report["items"][pos] or {"status": 0, "error": "not sent"}
+        if "error" in entry or entry["status"] not in (200, 201):
+            return {"status": "error", "message": f"{entry.get('error', 'unknown')} (HTTP {entry['status']})"}
+        return {"status": "ok", "id": entry.get("id")}
+
+    items = [
+        {"entity": item["entity"], "attribute": item["attribute"], **_result(pos)}
+        for pos, item in enumerate(normalized)
+    ]
+    categories = {cat: {"domain": _result(pos)} for cat, pos in domain_positions.items()}
+    episode = merged or _result(episode_pos)
+    if sig and not merged and episode["status"] == "ok" and episode.get("id"):
+        backing = report["items"][episode_pos].get("index")
+        _dedup_add(episode["id"], episode_category, sig, backing or "episodic-memories")
+    ok_count = sum(1 for i in items if i["status"] == "ok")
+    summary = f"Saved {ok_count}/{len(items)} triples across {len(categories)} categories"
+    if report["failed"]:
+        summary += f" — {report['failed']} writes failed"
+
+    # Audit log entry — one per batch
+    try:
+        await _index_document("memory-access-log", {
+            "timestamp": now,
+            "action": "remember_batch",
+            "query": ", ".join(f"{i['entity']} {i['attribute']}" for i in items)[:MAX_VALUE_LENGTH],
+            "experience_grade": "NEW",
+            "relevance_score": max(i["confidence"] for i in normalized),
+            "blindspot_triggered": False,
+        })
+    except Exception as e:
+        logger.error("remember_batch: audit log write failed: %s", e)
+
+    response = {"summary": summary, "items": items, "episodic": episode, "categories": categories}
+    if canonicalized:
+        response["canonicalized"] = canonicalized
+    return json.dumps(response, ensure_ascii=False)
+
+
+# ─── Response Pagination ──────────────────────────────────────
+
+PAGE_MAX_BYTES = int(os.getenv("PAGE_MAX_BYTES", "200000"))  # default per-response budget
+PAGE_MIN_BYTES = 4096
+PAGE_MAX_BYTES_LIMIT = 1024 * 1024  # 1MB
+PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL_SECONDS", "600"))  # 10 minutes
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "32"))
+
+# Stream keys rendered as newline-terminated text instead of a JSON list.
+# Every line (including the last) ends with "\n", so pages concatenate.
+_PAGE_TEXT_KEYS = frozenset({"ndjson"})
+
+# cache_id → (expires_at, tool, identity, head, stream). Shared with scheduler
+# threads. The cache is per process: cursors only resolve on the instance that
+# issued them, so multi-instance deployments need session affinity
+# (Cloud Run --session-affinity); elsewhere the caller restarts without cursor.
+_page_cache: dict[str, tuple[float, str, str, dict, list]] = {}
+_page_cache_lock = threading.Lock()
+
+
+def _page_cache_put(tool: str, head: dict, stream: list) -> str:
+    """Cache a computed result so later pages don't recompute it."""
+    cache_id = uuid.uuid4().hex
+    now = time.monotonic()
+    with _page_cache_lock:
+        for key in [k for k, v in _page_cache.items() if v[0] < now]:
+            del _page_cache[key]
+        while len(_page_cache) >= PAGE_CACHE_MAX_ENTRIES:
+            del _page_cache[min(_page_cache, key=lambda k: _page_cache[k][0])]
+        _page_cache[cache_id] = (now + PAGE_CACHE_TTL, tool, _request_identity.get(), head, stream)
+    return cache_id
+
+
+def _encode_cursor(cache_id: str, offset: int) -> str:
+    raw = json.dumps({"id": cache_id, "o": offset}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int] | None:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return str(data["id"]), int(data["o"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _paged_response(
+    tool: str,
+    head: dict,
+    stream: list[tuple[str, object]],
+    max_bytes: int = PAGE_MAX_BYTES,
+    summary_only: bool = False,
+    offset: int = 0,
+    cache_id: str | None = None,
+) -> str:
+    """Render one size-bounded page of a (key, item) stream.
+
+    head is repeated on every page; stream items are grouped under their key.
+    When items remain, the result is cached and an opaque next_cursor returned.
+    summary_only returns head plus a cursor to fetch items later.
+    """
+    max_bytes = max(PAGE_MIN_BYTES, min(int(max_bytes), PAGE_MAX_BYTES_LIMIT))
+    budget = max_bytes - len(json.dumps(head, ensure_ascii=False).encode("utf-8"))
+
+    page: list[tuple[str, object]] = []
+    used = 0
+    end = offset
+    if not summary_only:
+        while end < len(stream):
+            key, item = stream[end]
+            size = len((item if isinstance(item, str) else json.dumps(item, ensure_ascii=False)).encode("utf-8")) + 2
+            if page and used + size > budget:
+                break
+            page.append((key, item))
+            used += size
+            end += 1
+
+    next_cursor = None
+    if end < len(stream):
+        if cache_id is None:
+            cache_id = _page_cache_put(tool, head, stream)
+        next_cursor = _encode_cursor(cache_id, end)
+
+    body = dict(head)
+    grouped: dict[str, list] = defaultdict(list)
+    for key, item in page:
+        grouped[key].append(item)
+    for key, items in grouped.items():
+        body[key] = "".join(f"{item}\n" for item in items) if key in _PAGE_TEXT_KEYS else items
+    body["page"] = {"offset": offset, "count": len(page), "total": len(stream), "bytes": used}
+    body["next_cursor"] = next_cursor
+    return json.dumps(body, ensure_ascii=False)
+
+
+def _next_page(tool: str, cursor: str, max_bytes: int) -> str:
+    """Serve a follow-up page from the cache (only to the identity that started it)."""
+    decoded = _decode_cursor(cursor)
+    entry = None
+    if decoded:
+        with _page_cache_lock:
+            entry = _page_cache.get(decoded[0])
+    if (not entry or entry[1] != tool or entry[2] != _request_identity.get()
+            or entry[0] < time.monotonic()):
+        return json.dumps({"error": "Cursor is invalid, expired or from another server instance; "
+                                    "call again without cursor"})
+    _, _, _, head, stream = entry
+    return _paged_response(tool, head, stream, max_bytes, offset=decoded[1], cache_id=decoded[0])
+
+
+# ─── SPO Candidate Extraction ─────────────────────────────────
+
+SPO_ENTITY_LIMIT = int(os.getenv("SPO_ENTITY_LIMIT", "1000"))
+SPO_MAX_CANDIDATES = int(os.getenv("SPO_MAX_CANDIDATES", "100"))
+
+# Numeric value with optional unit: 50, 2GB, 512Mi, 5초, 1.28, 95%
+_SPO_VALUE = r"\d+(?:\.\d+)?\s?(?:[A-Za-z%]+|초|분|시간|일|개|배|건|회)?"
+# "20→50", "20 -> 50"
+_SPO_ARROW_RE = re.compile(rf"(?P<old>{_SPO_VALUE})\s*(?:→|->|=>)\s*(?P<new>{_SPO_VALUE})")
+# "20에서 50으로", "5초를 10초로"
+_SPO_KO_CHANGE_RE = re.compile(rf"(?P<old>{_SPO_VALUE})\s*(?:에서|을|를)\s+(?P<new>{_SPO_VALUE})\s*(?:으로|로)")
+# "max_connections=200", "hikari.maximum-pool-size: 50"
+_SPO_CONFIG_RE = re.compile(
+    r"(?<![\w./-])(?P<key>[A-Za-z][\w.-]*[A-Za-z0-9_])\s*(?P<sep>[=:])\s*"
+    r"(?P<value>[^\s,;/'\"][^\s,;'\"]*)"
+)
+# Config keys anywhere in the text (also ones consumed as another match's value)
+_SPO_CONFIG_KEY_RE = re.compile(r"(?<![\w./-])(?P<key>[A-Za-z][\w.-]*[A-Za-z0-9_])\s*(?P<sep>[=:])")
+# Standalone values anywhere in the text, unit attached (ASCII boundaries, so "30초로" yields "30초")
+_SPO_VALUE_RE = re.compile(
+    r"(?<![A-Za-z0-9_.-])\d+(?:\.\d+)?(?:[A-Za-z%]+|초|분|시간|일|개|배|건|회)?(?![A-Za-z0-9_.])"
+)
+# Unknown entities: hyphenated service-like names (payment-service, order-db)
+_SPO_ENTITY_GUESS_RE = re.compile(r"\b[a-z][a-z0-9]*(?:-[a-z0-9]+)+\b")
+_SPO_SENTENCE_BREAK_RE = re.compile(r"[.!?\n]\s")
+_KO_PARTICLES = ("을", "를", "이", "가", "은", "는", "도", "의")
+
+
+def _normalize_key(text: str) -> str:
+    """Normalize an attribute-like phrase to the dashed keyword form."""
+    return re.sub(r"[\s_]+", "-", text.strip().lower()).strip("-.")
+
+
+def _is_config_key(key: str) -> bool:
+    """Only dotted/underscored/dashed keys count as `key: value` config."""
+    return any(c in key for c in "._-")
+
+
+def _stated_values(text: str) -> set[str]:
+    """Numeric values and config values a text states ("30s", "512mi", "true")."""
+    values = {m.group().lower() for m in _SPO_VALUE_RE.finditer(text)}
+    values.update(m.group("value").lower() for m in _SPO_CONFIG_RE.finditer(text))
+    return values
+
+
+async def _load_known_entities() -> dict[str, set[str]]:
+    """Known entity → attribute set from semantic-memories."""
+    resp = await _es_aggregate("semantic-memories", {
+        "aggs": {
+            "by_entity": {
+                "terms": {"field": "entity", "size": SPO_ENTITY_LIMIT},
+                "aggs": {"attributes": {"terms": {"field": "attribute", "size": 100}}},
+            }
+        },
+    })
+    known: dict[str, set[str]] = {}
+    for b in resp.get("aggregations", {}).get("by_entity", {}).get("buckets", []):
+        known[b["key"]] = {a["key"] for a in b["attributes"]["buckets"]}
+    return known
+
+
+@functools.lru_cache(maxsize=4096)
+def _entity_pattern(entity: str) -> re.Pattern:
+    """Whole-name match: "order-db" must not match inside "order-db-replica" or "border-dbx".
+
+    The boundary is ASCII-only so Korean particles may follow ("order-db에서").
+    """
+    return re.compile(rf"(?<![A-Za-z0-9_-]){re.escape(entity)}(?![A-Za-z0-9_-])")
+
+
+def _entity_mentions(lowered: str, known: dict[str, set[str]]) -> dict[str, list[int]]:
+    """Start offsets of every whole-name mention of a known entity."""
+    return {
+        entity: starts
+        for entity in known
+        if entity in lowered and (starts := [m.start() for m in _entity_pattern(entity).finditer(lowered)])
+    }
+
+
+def _find_entity(
+    text: str, pos: int, known: dict[str, set[str]],
+    mentions: dict[str, list[int]], config_keys: list[tuple[int, int]],
+) -> tuple[str | None, bool]:
+    """Entity nearest before pos (known entities first). Returns (entity, is_known).
+
+    mentions comes from _entity_mentions; config_keys are the spans of
+    `key: value` keys, which are never guessed as entities.
+    """
+    best, best_pos = None, -1
+    for entity, starts in mentions.items():
+        preceding = [i for i in starts if i < pos]
+        idx = preceding[-1] if preceding else -2  # mentioned elsewhere: weaker than a preceding mention
+        if idx > best_pos or (idx == best_pos and best and len(entity) > len(best)):
+            best, best_pos = entity, idx
+    if best is not None:
+        return best, True
+
+    lowered = text.lower()
+    known_attrs = {a for attrs in known.values() for a in attrs}
+    guesses = [
+        m for m in _SPO_ENTITY_GUESS_RE.finditer(lowered)
+        if m.group() not in known_attrs
+        and not any(start < m.end() and m.start() < end for start, end in config_keys)
+    ]
+    preceding = [m for m in guesses if m.start() < pos]
+    if preceding:
+        return preceding[-1].group(), False
+    if guesses:
+        return guesses[0].group(), False
+    return None, False
+
+
+def _match_attribute(window: str, entity: str | None, known: dict[str, set[str]]) -> tuple[str | None, bool]:
+    """Attribute named in the text window before a value. Returns (attribute, is_known)."""
+    normalized = _normalize_key(window)
+    entity_attrs = known.get(entity, set()) if entity else set()
+    all_attrs = {a for attrs in known.values() for a in attrs}
+    for candidates in (entity_attrs, all_attrs):
+        matches = [a for a in candidates if a in normalized]
+        if matches:
+            return max(matches, key=len), True
+
+    words = [w for w in re.split(r"\s+", window.strip()) if w and not re.fullmatch(r"\W+", w)]
+    if entity:
+        words = [w for w in words if entity not in w.lower()]
+    if not words:
+        return None, False
+    tail = words[-2:]
+    for i, w in enumerate(tail):
+        for particle in _KO_PARTICLES:
+            if w.endswith(particle) and len(w) > len(particle):
+                tail[i] = w[: -len(particle)]
+                break
+    return _normalize_key(" ".join(tail)) or None, False
+
+
+def _extract_spo_candidates(episodes: list[dict], known: dict[str, set[str]]) -> list[dict]:
+    """Deterministically extract entity/attribute/value candidates from episode text.
+
+    Looks for value changes ("20→50", "20에서 50으로") and config key=value
+    patterns, resolves the entity/attribute against known semantic-memories
+    keys, and scores each triple so the agent only confirms candidates.
+    """
+    merged: dict[tuple[str, str, str], dict] = {}
+
+    for ep in episodes:
+        text = ep.get("raw_text") or ep.get("content") or ""
+        found: list[tuple[int, str | None, str, str | None, str]] = []
+
+        changes = sorted(
+            (m for regex in (_SPO_ARROW_RE, _SPO_KO_CHANGE_RE) for m in regex.finditer(text)),
+            key=lambda m: m.start(),
+        )
+        prev_end = 0
+        for m in changes:
+            # Attribute window: same sentence/clause, after the previous change
+            window = text[max(prev_end, m.start() - 60):m.start()]
+            breaks = list(_SPO_SENTENCE_BREAK_RE.finditer(window)) + list(re.finditer(r"[,;]\s*", window))
+            if breaks:
+                window = window[max(b.end() for b in breaks):]
+            prev_end = m.end()
+            found.append((m.start(), window, m.group("new").strip(), m.group("old").strip(), "change"))
+
+        for m in _SPO_CONFIG_RE.finditer(text):
+            key = m.group("key")
+            if m.group("sep") == ":" and not _is_config_key(key):
+                continue
+            found.append((m.start(), None, m.group("value").strip(), None, "config:" + key))
+
+        config_keys = [
+            m.span("key") for m in _SPO_CONFIG_KEY_RE.finditer(text)
+            if m.group("sep") == "=" or _is_config_key(m.group("key"))
+        ]
+        mentions = _entity_mentions(text.lower(), known) if found else {}
+        for pos, window, value, previous, pattern in found:
+            entity, entity_known = _find_entity(text, pos, known, mentions, config_keys)
+            if not entity:
+                continue
+            if pattern.startswith("config:"):
+                attribute = _normalize_key(pattern[len("config:"):])
+                attribute_known = attribute in known.get(entity, set())
+                pattern = "config"
+            else:
+                attribute, attribute_known = _match_attribute(window, entity, known)
+            if not attribute or attribute == entity:
+                continue
+
+            score = 0.3
+            score += 0.3 if entity_known else 0.1
+            score += 0.2 if attribute_known else 0.0
+            score += 0.1 if pattern == "change" else 0.0
+            score += 0.1 * min(float(ep.get("importance", 0.5)), 1.0)
+            score = round(min(score, 1.0), 2)
+
+            key = (entity, attribute, value)
+            existing = merged.get(key)
+            if existing:
+                if ep["id"] not in existing["episode_ids"]:
+                    existing["episode_ids"].append(ep["id"])
+                existing["score"] = max(existing["score"], score)
+                continue
+            snippet_start = max(0, pos - 40)
+            candidate = {
+                "entity": entity,
+                "attribute": attribute,
+                "value": value,
+                "category": ep.get("category", "unknown"),
+                "score": score,
+                "known_entity": entity_known,
+                "known_attribute": attribute_known,
+                "pattern": pattern,
+                "episode_ids": [ep["id"]],
+                "evidence": text[snippet_start:pos + 60].strip(),
+            }
+            if previous:
+                candidate["previous_value"] = previous
+            merged[key] = candidate
+
+    candidates = sorted(merged.values(), key=lambda c: (-c["score"], c["entity"], c["attribute"]))
+    return candidates[:SPO_MAX_CANDIDATES]
 
 
 # ─── MCP Tool 2: reflect_consolidate ──────────────────────────
 
+# Episodes are marked reflected=true by a background task, so a run can return
+# before the mark lands. Their ids stay here (keyed by the task that marks them)
+# until the task ends and a refresh has made the mark searchable; the next run
+# excludes them instead of collecting and counting the same episodes again.
+REFLECT_PENDING_GRACE_SECONDS = 2.0  # > default index.refresh_interval (1s)
+
+_reflect_pending: dict[str, list[str]] = {}
+_reflect_pending_lock = threading.Lock()
+
+
+def _reflect_pending_ids() -> list[str]:
+    """Episode ids whose reflected=true update is still in flight. Drops settled tasks."""
+    now_m = time.monotonic()
+    with _reflect_pending_lock:
+        pending = list(_reflect_pending.items())
+    ids = []
+    for task_id, episode_ids in pending:
+        chain = _task_chain(task_id)
+        last = chain[-1] if chain else None
+        if last is None or (last.get("finished_m") and not last.get("retried_as")
+                            and now_m - last["finished_m"] > REFLECT_PENDING_GRACE_SECONDS):
+            with _reflect_pending_lock:
+                _reflect_pending.pop(task_id, None)
+            continue
+        ids.extend(episode_ids)
+    return ids
+
+
 @mcp.tool()
-async def reflect_consolidate() -> str:
+@_admission
+async def reflect_consolidate(
+    cursor: str = "",
+    max_bytes: int = PAGE_MAX_BYTES,
+    summary_only: bool = False,
+) -> str:
     """Consolidate episodic memories into semantic memory analysis.
 
     Collects episodes with reflected=false, aggregates statistics by category,
-    updates domain density information, and returns episode texts.
-    The agent can then perform additional analysis such as SPO extraction.
+    updates domain density information, and extracts SPO candidate triples
+    (entity/attribute/value) scored against known semantic-memories entities.
+    The agent confirms candidates via remember_memory instead of rereading episodes.
+
+    Responses are size-bounded: spo_candidates and episodes_for_review are
+    paged, and next_cursor fetches the rest of the same run.
+
+    Args:
+        cursor: next_cursor from a previous response (continues that run)
+        max_bytes: Maximum response size in bytes
+        summary_only: Return only summary/statistics plus a cursor for the items
     """
+    if cursor:
+        return _next_page("reflect_consolidate", cursor, max_bytes)
+
     now = datetime.now(timezone.utc).isoformat()
     results = {}
 
-    # STEP 1: Search episodic-memories for reflected=false (max 50)
+    # STEP 1: Search episodic-memories for reflected=false (max 50), skipping
+    # episodes an earlier run is still marking
+    query: dict = {"term": {"reflected": False}}
+    pending = _reflect_pending_ids()
+    if pending:
+        query = {"bool": {"filter": [query], "must_not": [{"ids": {"values": pending}}]}}
     try:
         episodic_resp = await _es_search("episodic-memories", {
-            "query": {"term": {"reflected": False}},
+            "query": query,
             "size": 50,
             "sort": [{"timestamp": "desc"}],
             "_source": ["raw_text", "content", "category", "importance", "timestamp"],
-        })
+        }, fresh=True)  # decides which episodes get marked reflected
         hits = episodic_resp.get("hits", {}).get("hits", [])
     except Exception as e:
         logger.error("reflect: episodic search failed: %s", e)
@@ -354,14 +2828,17 @@ async def reflect_consolidate() -> str:
 
     for hit in hits:
         src = hit["_source"]
-        cat = src.get("category", "unknown")
+        cats = src.get("category") or "unknown"
+        cats = cats if isinstance(cats, list) else [cats]  # batch episodes carry every category
         raw_imp = src.get("importance", 0.5)
         imp = float(raw_imp) if not isinstance(raw_imp, (int, float)) else raw_imp
-        categories[cat]["count"] += 1
-        categories[cat]["total_importance"] += imp
-        categories[cat]["episodes"].append({
+        for cat in cats:
+            categories[cat]["count"] += 1
+            categories[cat]["total_importance"] += imp
+        categories[cats[0]]["episodes"].append({
             "id": hit["_id"],
             "content": src.get("content", src.get("raw_text", "")),
+            "raw_text": src.get("raw_text", ""),
             "importance": imp,
             "timestamp": src.get("timestamp"),
         })
@@ -431,68 +2908,153 @@ async def reflect_consolidate() -> str:
 
     results["domain_updates"] = domain_updates
 
-    # STEP 5: Mark processed episodes as reflected=true
+    # STEP 5: Mark processed episodes as reflected=true (background ES task)
     try:
-        update_resp = await _es_update_by_query("episodic-memories", {
-            "query": {"ids": {"values": episode_ids}},
+        # reflected=false in the query keeps conflict retries to the episodes still pending
+        task = await _submit_es_task("update_by_query", "episodic-memories", {
+            "query": {"bool": {"filter": [
+                {"ids": {"values": episode_ids}},
+                {"term": {"reflected": False}},
+            ]}},
             "script": {
                 "source": "ctx._source.reflected = true",
                 "lang": "painless",
             },
-        })
-        results["marked_reflected"] = update_resp.get("updated", 0)
+        }, description=f"reflect: mark {len(episode_ids)} episodes reflected")
+        with _reflect_pending_lock:
+            _reflect_pending[task["task_id"]] = episode_ids
+        attempts = task.get("attempts") or [{"updated": task["progress"]["updated"]}]
+        results["marked_reflected"] = {
+            "task_id": task["task_id"],
+            "status": task["status"],
+            "updated": sum(a["updated"] for a in attempts),
+            "version_conflicts": task["progress"]["version_conflicts"],
+            "conflict_retries": len(attempts) - 1,
+        }
     except Exception as e:
         logger.error("reflect: update_by_query failed: %s", e)
         results["marked_reflected"] = {"error": _safe_error(e)}
 
-    # STEP 6: Return episode texts for review
-    episodes_for_review = []
+    # STEP 6: Extract SPO candidates (deterministic, no LLM round trip)
+    try:
+        known_entities = await _load_known_entities()
+    except Exception as e:
+        logger.error("reflect: known entity aggregation failed: %s", e)
+        known_entities = {}
+    spo_candidates = _extract_spo_candidates(
+        [dict(ep, category=cat) for cat, data in categories.items() for ep in data["episodes"]],
+        known_entities,
+    )
+
+    # STEP 7: Return candidates + episode texts for review (paged)
+    stream: list[tuple[str, object]] = [("spo_candidates", c) for c in spo_candidates]
     for cat, data in categories.items():
         for ep in data["episodes"]:
-            episodes_for_review.append({
+            stream.append(("episodes_for_review", {
                 "category": cat,
                 "content": ep["content"],
                 "importance": ep["importance"],
-            })
+            }))
 
     total_processed = len(episode_ids)
     summary = (
         f"Consolidated {total_processed} episodes. "
         f"{len(category_stats)} categories: "
         + ", ".join(f"{k}({v['episode_count']})" for k, v in category_stats.items())
+        + f". {len(spo_candidates)} SPO candidates extracted."
     )
 
-    return json.dumps({
+    head = {
         "summary": summary,
         "episodes_processed": total_processed,
         "category_stats": category_stats,
         "domain_updates": domain_updates,
-        "episodes_for_review": episodes_for_review,
-    }, ensure_ascii=False)
+        "marked_reflected": results["marked_reflected"],
+    }
+    return _paged_response("reflect_consolidate", head, stream, max_bytes, summary_only)
 
 
 # ─── MCP Tool 3: generate_blindspot_report ────────────────────
 
-@mcp.tool()
-async def generate_blindspot_report() -> str:
-    """Generate a blindspot report for all knowledge domains.
+BLINDSPOT_CACHE_TTL = int(os.getenv("BLINDSPOT_CACHE_TTL_SECONDS", "3600"))
+BLINDSPOT_REVALIDATE_SECONDS = int(os.getenv("BLINDSPOT_REVALIDATE_SECONDS", "30"))
+
+# {"etag", "generation", "built_at", "checked_at", "summary", "report"}
+_blindspot_cache: dict = {}
+_blindspot_cache_lock = threading.Lock()
+
+
+async def _domain_data_etag() -> str:
+    """Version tag of the domain data: doc count + latest write of staging and lookup."""
+    parts = []
+    for index in ("knowledge-domains-staging", "knowledge-domains"):
+        resp = await _es_aggregate(index, {
+            "track_total_hits": True,
+            "aggs": {"latest": {"max": {"field": "last_updated"}}},
+        })
+        parts.append([
+            resp.get("hits", {}).get("total", {}).get("value", 0),
+            resp.get("aggregations", {}).get("latest", {}).get("value"),
+        ])
+    return hashlib.sha1(json.dumps(parts).encode()).hexdigest()[:16]
+
+
+async def _cached_blindspot() -> dict | None:
+    """Return the cached report if the domain data has not changed since it was built."""
+    with _blindspot_cache_lock:
+        entry = dict(_blindspot_cache)
+    if not entry:
+        return None
+    now_m = time.monotonic()
+    if entry["generation"] != _domain_data_generation or now_m - entry["built_at"] > BLINDSPOT_CACHE_TTL:
+        return None
+    if now_m - entry["checked_at"] < BLINDSPOT_REVALIDATE_SECONDS:
+        return entry
+    try:
+        etag = await _domain_data_etag()
+    except Exception as e:
+        logger.warning("blindspot: etag check failed: %s", e)
+        return None
+    if etag != entry["etag"]:
+        return None
+    with _blindspot_cache_lock:
+        if _blindspot_cache.get("etag") == etag:
+            _blindspot_cache["checked_at"] = now_m
+    return entry
+
+
+async def _refresh_blindspot_cache() -> tuple[str | None, str, dict]:
+    """Rebuild the report and cache it under the current etag. Returns (etag, summary, report)."""
+    generation = _domain_data_generation
+    try:
+        etag = await _domain_data_etag()
+    except Exception as e:
+        logger.warning("blindspot: etag computation failed: %s", e)
+        etag = None
+    report, summary = await _build_blindspot_report()
+    if etag:
+        built_at = time.monotonic()
+        with _blindspot_cache_lock:
+            _blindspot_cache.clear()
+            _blindspot_cache.update({
+                "etag": etag, "generation": generation,
+                "built_at": built_at, "checked_at": built_at,
+                "summary": summary, "report": report,
+            })
+    return etag, summary, report
 
-    Calculates density/staleness for all domains and returns a structured
-    report with VOID/SPARSE/DENSE/Stale classifications.
-    """
-    now = datetime.now(timezone.utc).isoformat()
 
+async def _build_blindspot_report() -> tuple[dict, str]:
+    """Merge lookup + staging domains and classify them. Returns (report, summary)."""
     # STEP 1: Merge query from knowledge-domains (lookup) + staging
     domains = {}
 
-    # lookup index (static domain list)
+    # lookup index (static domain list, search_after paging)
     try:
-        lookup_resp = await _es_search("knowledge-domains", {
-            "query": {"match_all": {}},
-            "size": 100,
-            "_source": ["domain", "memory_count", "avg_confidence", "density_score", "last_updated"],
-        })
-        for hit in lookup_resp.get("hits", {}).get("hits", []):
+        async for hit in _es_scan(
+            "knowledge-domains",
+            ["domain", "memory_count", "avg_confidence", "density_score", "last_updated"],
+        ):
             src = hit["_source"]
             domain_name = src.get("domain", "unknown")
             domains[domain_name] = {
@@ -505,25 +3067,18 @@ async def generate_blindspot_report() -> str:
     except Exception as e:
         logger.error("blindspot: knowledge-domains lookup failed: %s", e)
 
-    # staging index (reflects latest updates)
+    # staging index (reflects latest updates, composite paging)
     try:
-        staging_agg = await _es_aggregate("knowledge-domains-staging", {
-            "aggs": {
-                "by_domain": {
-                    "terms": {"field": "domain", "size": 100},
-                    "aggs": {
-                        "latest": {"max": {"field": "last_updated"}},
-                        "avg_density": {"avg": {"field": "density_score"}},
-                        "avg_conf": {"avg": {"field": "avg_confidence"}},
-                        "total_memory": {"sum": {"field": "memory_count"}},
-                    },
-                }
-            },
+        staging_buckets = await _es_composite("knowledge-domains-staging", "domain", {
+            "latest": {"max": {"field": "last_updated"}},
+            "avg_density": {"avg": {"field": "density_score"}},
+            "avg_conf": {"avg": {"field": "avg_confidence"}},
+            "total_memory": {"sum": {"field": "memory_count"}},
         })
-        for b in staging_agg.get("aggregations", {}).get("by_domain", {}).get("buckets", []):
+        for b in staging_buckets:
             domain_name = b["key"]
             # Overwrite if staging is newer than lookup
-            if domain_name not in domains or (b["latest"]["value_as_string"] or "") > (domains.get(domain_name, {}).get("last_updated") or ""):
+            if domain_name not in domains or (b["latest"].get("value_as_string") or "") > (domains.get(domain_name, {}).get("last_updated") or ""):
                 density = b["avg_density"]["value"] if b["avg_density"]["value"] is not None else 0
                 domains[domain_name] = {
                     "source": "staging",
@@ -578,6 +3133,30 @@ async def generate_blindspot_report() -> str:
         f"Stale {len(report['stale'])}"
     )
 
+    return report, summary
+
+
+@mcp.tool()
+@_admission
+async def generate_blindspot_report(if_none_match: str = "") -> str:
+    """Generate a blindspot report for all knowledge domains.
+
+    Calculates density/staleness for all domains and returns a structured
+    report with VOID/SPARSE/DENSE/Stale classifications. The report is cached
+    under an etag tied to the domain data; repeat calls return the cached report
+    until a sync or staging write changes it.
+
+    Args:
+        if_none_match: etag from a previous response. If unchanged, only summary is returned.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+
+    cached = await _cached_blindspot()
+    if cached:
+        etag, summary, report = cached["etag"], cached["summary"], cached["report"]
+    else:
+        etag, summary, report = await _refresh_blindspot_cache()
+
     # STEP 3: Audit log entry
     try:
         await _index_document("memory-access-log", {
@@ -588,50 +3167,57 @@ async def generate_blindspot_report() -> str:
     except Exception as e:
         logger.error("blindspot: audit log write failed: %s", e)
 
+    if etag and if_none_match == etag:
+        return json.dumps({
+            "summary": summary, "etag": etag, "not_modified": True,
+        }, ensure_ascii=False)
+
     return json.dumps({
         "summary": summary,
         "report": report,
+        "etag": etag,
+        "cached": bool(cached),
     }, ensure_ascii=False)
 
 
 # ─── MCP Tool 4: export_knowledge_base ────────────────────────
 
 @mcp.tool()
-async def export_knowledge_base() -> str:
+@_admission
+async def export_knowledge_base(
+    cursor: str = "",
+    max_bytes: int = PAGE_MAX_BYTES,
+    summary_only: bool = False,
+) -> str:
     """Export the entire organizational knowledge base as NDJSON.
 
     Converts all documents from episodic-memories, semantic-memories,
     and knowledge-domains into NDJSON with _type tags.
     Can be used for Git-based team sharing or backup.
+
+    Responses are size-bounded: concatenate the ndjson of every page
+    (each ends with a newline), following next_cursor until it is null.
+    Cursors are valid for PAGE_CACHE_TTL_SECONDS on the instance that issued them.
+
+    Args:
+        cursor: next_cursor from a previous response (continues that export)
+        max_bytes: Maximum response size in bytes
+        summary_only: Return only counts plus a cursor for the NDJSON
     """
+    if cursor:
+        return _next_page("export_knowledge_base", cursor, max_bytes)
+
     now = datetime.now(timezone.utc).isoformat()
     lines: list[str] = []
     counts = {"episodic": 0, "semantic": 0, "domain": 0}
 
     async def _scan_index(index: str, source_fields: list[str], doc_type: str):
         """Scan all documents using search_after pagination."""
-        search_after = None
-        while True:
-            body: dict = {
-                "query": {"match_all": {}},
-                "size": 100,
-                "sort": [{"_doc": "asc"}],
-                "_source": source_fields,
-            }
-            if search_after:
-                body["search_after"] = search_after
-
-            resp = await _es_search(index, body)
-            hits = resp.get("hits", {}).get("hits", [])
-            if not hits:
-                break
-
-            for hit in hits:
-                doc = hit["_source"]
-                doc["_type"] = doc_type
-                lines.append(json.dumps(doc, ensure_ascii=False))
-                counts[doc_type] += 1
-                search_after = hit["sort"]
+        async for hit in _es_scan(index, source_fields):
+            doc = hit["_source"]
+            doc["_type"] = doc_type
+            lines.append(json.dumps(doc, ensure_ascii=False))
+            counts[doc_type] += 1
 
     # 1) episodic-memories (exclude content — semantic_text, regenerated on import)
     try:
@@ -664,7 +3250,6 @@ async def export_knowledge_base() -> str:
     except Exception as e:
         logger.error("export: domain scan failed: %s", e)
 
-    ndjson = "\n".join(lines)
     total = sum(counts.values())
     summary = (
         f"Export complete: episodic {counts['episodic']}, "
@@ -682,14 +3267,15 @@ async def export_knowledge_base() -> str:
     except Exception as e:
         logger.error("export: audit log failed: %s", e)
 
-    return json.dumps({
-        "summary": summary, "ndjson": ndjson, "counts": counts,
-    }, ensure_ascii=False)
+    head = {"summary": summary, "counts": counts}
+    stream = [("ndjson", line) for line in lines]
+    return _paged_response("export_knowledge_base", head, stream, max_bytes, summary_only)
 
 
 # ─── MCP Tool 5: import_knowledge_base ────────────────────────
 
 @mcp.tool()
+@_admission
 async def import_knowledge_base(ndjson: str) -> str:
     """Import a knowledge base from NDJSON format.
 
@@ -730,31 +3316,37 @@ async def import_knowledge_base(ndjson: str) -> str:
 
     # 1) episodic-memories — bulk insert
     if docs["episodic"]:
-        bulk_lines = []
+        actions = []
         for doc in docs["episodic"]:
             doc["content"] = doc.get("raw_text", "")  # for semantic_text regeneration
             doc.setdefault("reflected", False)
             doc.setdefault("timestamp", now)
-            bulk_lines.append(json.dumps({"index": {"_index": "episodic-memories"}}))
-            bulk_lines.append(json.dumps(doc, ensure_ascii=False))
+            actions.append(({"index": {"_index": "episodic-memories"}}, doc))
         try:
-            resp = await _es_bulk("\n".join(bulk_lines) + "\n")
-            imported["episodic"] = sum(
-                1 for item in resp.get("items", [])
-                if item.get("index", {}).get("status") in (200, 201)
-            )
+            report = await _bulk_write(actions)
+            imported["episodic"] = report["succeeded"]
+            errors.extend(_bulk_error_summary("episodic", report))
         except Exception as e:
             errors.append(f"episodic bulk: {_safe_error(e)}")
 
     # 2) semantic-memories — bulk insert after duplicate check
     if docs["semantic"]:
-        bulk_lines = []
-        for doc in docs["semantic"]:
-            entity = doc.get("entity", "").strip().lower()
-            attribute = doc.get("attribute", "").strip().lower()
+        actions = []
+        given = [
+            (doc.get("entity", "").strip().lower(), doc.get("attribute", "").strip().lower())
+            for doc in docs["semantic"]
+        ]
+        canonical_pairs, _ = await _canonicalize(given)
+        for doc, (given_entity, given_attribute), (entity, attribute) in zip(
+            docs["semantic"], given, canonical_pairs,
+        ):
             value = doc.get("value", "")
             doc["entity"] = entity
             doc["attribute"] = attribute
+            if entity != given_entity:
+                doc.setdefault("entity_alias", given_entity)
+            if attribute != given_attribute:
+                doc.setdefault("attribute_alias", given_attribute)
             doc["content"] = f"{entity} {attribute} {value}"  # for semantic_text regeneration
             doc.setdefault("last_updated", now)
 
@@ -781,31 +3373,25 @@ async def import_knowledge_base(ndjson: str) -> str:
             except Exception:
                 pass  # Proceed with save even if duplicate check fails
 
-            bulk_lines.append(json.dumps({"index": {"_index": "semantic-memories"}}))
-            bulk_lines.append(json.dumps(doc, ensure_ascii=False))
+            actions.append(({"index": {"_index": "semantic-memories"}}, doc))
 
         try:
-            resp = await _es_bulk("\n".join(bulk_lines) + "\n")
-            imported["semantic"] = sum(
-                1 for item in resp.get("items", [])
-                if item.get("index", {}).get("status") in (200, 201)
-            )
+            report = await _bulk_write(actions)
+            imported["semantic"] = report["succeeded"]
+            errors.extend(_bulk_error_summary("semantic", report))
         except Exception as e:
             errors.append(f"semantic bulk: {_safe_error(e)}")
 
     # 3) knowledge-domains-staging — bulk insert
     if docs["domain"]:
-        bulk_lines = []
+        actions = []
         for doc in docs["domain"]:
             doc.setdefault("last_updated", now)
-            bulk_lines.append(json.dumps({"index": {"_index": "knowledge-domains-staging"}}))
-            bulk_lines.append(json.dumps(doc, ensure_ascii=False))
+            actions.append(({"index": {"_index": "knowledge-domains-staging"}}, doc))
         try:
-            resp = await _es_bulk("\n".join(bulk_lines) + "\n")
-            imported["domain"] = sum(
-                1 for item in resp.get("items", [])
-                if item.get("index", {}).get("status") in (200, 201)
-            )
+            report = await _bulk_write(actions)
+            imported["domain"] = report["succeeded"]
+            errors.extend(_bulk_error_summary("domain", report))
         except Exception as e:
             errors.append(f"domain bulk: {_safe_error(e)}")
 
@@ -858,36 +3444,46 @@ KNOWLEDGE_DOMAINS_SCHEMA = {
 
 
 @mcp.tool()
+@_admission
 async def sync_knowledge_domains() -> str:
     """Sync knowledge-domains-staging → knowledge-domains (lookup).
 
     Aggregates from staging → deletes lookup → recreates → bulk insert.
     Called periodically by Cloud Scheduler.
     """
-    # 1. Aggregate by domain from staging
+    # One sync at a time across replicas, however it was triggered
+    lease = _current_lease.get()
+    if lease and lease[0] == SYNC_LEASE:
+        return await _sync_knowledge_domains()
+    async with _job_lease(SYNC_LEASE) as held:
+        if not held:
+            return json.dumps({"summary": "Sync skipped — another sync holds the lease"}, ensure_ascii=False)
+        return await _sync_knowledge_domains()
+
+
+async def _sync_knowledge_domains() -> str:
+    # 1. Aggregate by domain from staging (composite paging — no domain cap)
     try:
-        agg_resp = await _es_aggregate("knowledge-domains-staging", {
-            "aggs": {
-                "by_domain": {
-                    "terms": {"field": "domain", "size": 100},
-                    "aggs": {
-                        "latest": {"max": {"field": "last_updated"}},
-                        "avg_conf": {"avg": {"field": "avg_confidence"}},
-                        "max_count": {"max": {"field": "memory_count"}},
-                        "max_density": {"max": {"field": "density_score"}},
-                    },
-                }
-            },
-        })
+        buckets = await _es_composite("knowledge-domains-staging", "domain", {
+            "latest": {"max": {"field": "last_updated"}},
+            "avg_conf": {"avg": {"field": "avg_confidence"}},
+            "max_count": {"max": {"field": "memory_count"}},
+            "max_density": {"max": {"field": "density_score"}},
+        }, fresh=True)  # the lookup index is rebuilt from this
     except Exception as e:
         msg = f"sync: staging aggregation failed: {_safe_error(e)}"
         logger.error("sync: staging aggregation failed: %s", e)
         return json.dumps({"error": msg}, ensure_ascii=False)
 
-    buckets = agg_resp.get("aggregations", {}).get("by_domain", {}).get("buckets", [])
     if not buckets:
         return json.dumps({"summary": "No data in staging — skipping sync"}, ensure_ascii=False)
 
+    # Fencing: a scheduled run must still hold its lease before the destructive step
+    if not await _lease_still_held():
+        msg = "sync: scheduler lease lost — skipping lookup recreation"
+        logger.warning(msg)
+        return json.dumps({"error": msg}, ensure_ascii=False)
+
     # 2. Delete lookup index
     del_status = await _es_delete_index("knowledge-domains")
     logger.info("sync: knowledge-domains deleted HTTP %d", del_status)
@@ -900,7 +3496,7 @@ async def sync_knowledge_domains() -> str:
         return json.dumps({"error": msg}, ensure_ascii=False)
 
     # 4. Bulk insert aggregation results
-    bulk_lines = []
+    actions = []
     for b in buckets:
         domain = b["key"]
         mem_count = int(b["max_count"]["value"] or 0)
@@ -914,8 +3510,7 @@ async def sync_knowledge_domains() -> str:
         elif density < 5.0:
             status = "SPARSE"
 
-        bulk_lines.append(json.dumps({"index": {"_index": "knowledge-domains"}}))
-        bulk_lines.append(json.dumps({
+        actions.append(({"index": {"_index": "knowledge-domains"}}, {
             "domain": domain,
             "memory_count": mem_count,
             "avg_confidence": avg_conf,
@@ -924,55 +3519,680 @@ async def sync_knowledge_domains() -> str:
             "status": status,
         }))
 
-    bulk_body = "\n".join(bulk_lines) + "\n"
     try:
-        bulk_resp = await _es_bulk(bulk_body)
-        errors = bulk_resp.get("errors", False)
-        summary = f"Sync complete: {len(buckets)} domains"
-        if errors:
-            summary += " (some bulk errors occurred)"
+        report = await _bulk_write(actions)
+        summary = f"Sync complete: {report['succeeded']}/{len(buckets)} domains"
+        if report["failed"]:
+            summary += f" ({report['failed']} bulk errors occurred)"
         logger.info("sync: %s", summary)
-        return json.dumps({"summary": summary, "domains_synced": len(buckets)}, ensure_ascii=False)
+        result = {"summary": summary, "domains_synced": report["succeeded"]}
+        if report["failed"]:
+            result["errors"] = _bulk_error_summary("domain", report)
+        return json.dumps(result, ensure_ascii=False)
     except Exception as e:
         msg = f"sync: bulk insert failed: {_safe_error(e)}"
         logger.error("sync: bulk insert failed: %s", e)
         return json.dumps({"error": msg}, ensure_ascii=False)
 
 
+# ─── MCP Tool 7: get_slow_operations ───────────────────────────
+
+@mcp.tool()
+@_admission
+async def get_slow_operations(limit: int = 20, tool: str = "", min_duration_ms: float = 0) -> str:
+    """List recent slow ES operations recorded by the profiling mode.
+
+    Requires ES_PROFILE_MODE=slow|all. Each entry carries the calling tool,
+    its input size, ES latency/took, and a per-shard profile breakdown for
+    searches and aggregations. Entries are kept in memory per server instance.
+
+    Args:
+        limit: Maximum number of entries to return (newest first)
+        tool: Only entries triggered by this MCP tool (e.g., reflect_consolidate)
+        min_duration_ms: Only entries at least this slow
+    """
+    with _slow_ops_lock:
+        entries = list(_slow_ops)
+    if tool:
+        entries = [e for e in entries if e["tool"] == tool]
+    if min_duration_ms:
+        entries = [e for e in entries if e["duration_ms"] >= min_duration_ms]
+
+    # Per (tool, operation, index) stats to spot regressions
+    grouped: dict[tuple, list[float]] = defaultdict(list)
+    for e in entries:
+        grouped[(e["tool"], e["operation"], e["index"])].append(e["duration_ms"])
+    by_operation = []
+    for (t, op, idx), durations in grouped.items():
+        durations.sort()
+        by_operation.append({
+            "tool": t, "operation": op, "index": idx,
+            "count": len(durations),
+            "p50_ms": durations[len(durations) // 2],
+            "max_ms": durations[-1],
+        })
+    by_operation.sort(key=lambda g: -g["max_ms"])
+
+    limit = max(1, min(int(limit), SLOW_OP_LOG_SIZE))
+    summary = (
+        f"{len(entries)} slow operation(s) ≥ {SLOW_OP_THRESHOLD_MS:.0f}ms "
+        f"(profiling: {ES_PROFILE_MODE})"
+    )
+    return json.dumps({
+        "summary": summary,
+        "by_operation": by_operation,
+        "operations": list(reversed(entries))[:limit],
+    }, ensure_ascii=False)
+
+
+# ─── MCP Tool 8: manage_background_tasks ───────────────────────
+
+@mcp.tool()
+@_admission
+async def manage_background_tasks(action: str = "list", task_id: str = "") -> str:
+    """Show or cancel long-running ES operations (update/delete-by-query, reindex).
+
+    Tasks are submitted in the background by other tools (e.g. reflect_consolidate
+    marking episodes reflected) and tracked per server instance. Only the
+    identity that submitted a task can cancel it.
+
+    Args:
+        action: "list" (all tracked tasks), "status" (one task, refreshed from ES) or "cancel"
+        task_id: ES task id ("node:id") for status/cancel
+    """
+    if action == "list":
+        with _es_tasks_lock:
+            ids = list(_es_tasks)
+        tasks = [_task_public(t) for t in map(_task_snapshot, ids) if t]
+        running = sum(1 for t in tasks if t["status"] in ("running", "cancelling"))
+        return json.dumps({
+            "summary": f"{len(tasks)} tracked tasks, {running} running",
+            "tasks": sorted(tasks, key=lambda t: t["submitted_at"], reverse=True),
+        }, ensure_ascii=False)
+
+    if action not in ("status", "cancel"):
+        return json.dumps({"error": f"unknown action '{action}' (list|status|cancel)"})
+    if not _TASK_ID_RE.match(task_id):
+        return json.dumps({"error": "task_id must look like 'node:id'"})
+    tracked = _task_snapshot(task_id)
+    if tracked is None:
+        return json.dumps({"error": f"task {task_id} is not tracked by this server"})
+    if action == "cancel" and tracked["identity"] != _request_identity.get():
+        return json.dumps({"error": f"task {task_id} was submitted by another identity"})
+
+    try:
+        if action == "cancel":
+            entry = await _cancel_es_task(task_id)
+        else:
+            entry = await _refresh_task(task_id)
+    except Exception as e:
+        logger.error("tasks: %s %s failed: %s", action, task_id, e)
+        return json.dumps({"error": f"{action} failed: {_safe_error(e)}"})
+    if entry is None:
+        return json.dumps({"error": f"task {task_id} is not tracked by this server"})
+    return json.dumps(_task_public(entry), ensure_ascii=False)
+
+
+# ─── MCP Tool 9: rollup_access_log ─────────────────────────────
+# memory-access-log rows are deleted after 30 days (hippocampus-accesslog
+# ILM). Each run folds recent rows into one document per (interval bucket,
+# action, experience_grade, blindspot_triggered) in memory-access-rollups,
+# which has no ILM. Document ids are deterministic, so re-rolling a bucket
+# overwrites it: the open bucket is refreshed every run and late writes to
+# recent buckets are picked up within the lookback window.
+
+ROLLUP_INDEX = "memory-access-rollups"
+ROLLUP_SOURCE_INDEX = "memory-access-log"
+ROLLUP_LOOKBACK = {"hour": int(os.getenv("ROLLUP_LOOKBACK_HOURS", "48")) * 3600,
+                   "day": int(os.getenv("ROLLUP_LOOKBACK_DAYS", "3")) * 86400}
+ROLLUP_MAX_LOOKBACK_DAYS = 29  # stay inside the 30-day access-log retention
+ROLLUP_PERCENTS = (50, 90, 99)
+
+_ROLLUP_INTERVAL_SECONDS = {"hour": 3600, "day": 86400}
+_ROLLUP_SOURCES = [
+    {"action": {"terms": {"field": "action", "missing_bucket": True}}},
+    {"experience_grade": {"terms": {"field": "experience_grade", "missing_bucket": True}}},
+    {"blindspot_triggered": {"terms": {"field": "blindspot_triggered", "missing_bucket": True}}},
+]
+_ROLLUP_AGGS = {
+    "relevance": {"stats": {"field": "relevance_score"}},
+    "relevance_pct": {"percentiles": {"field": "relevance_score", "percents": list(ROLLUP_PERCENTS)}},
+}
+
+
+def _rollup_doc(interval: str, bucket: dict, now_ms: int, rolled_up_at: str) -> tuple[str, dict]:
+    """(doc id, rollup document) for one composite bucket."""
+    key = bucket["key"]
+    start_ms = key["bucket"]
+    end_ms = start_ms + _ROLLUP_INTERVAL_SECONDS[interval] * 1000
+    blindspot = key["blindspot_triggered"]
+    if blindspot is not None:  # boolean terms keys come back as 0/1 (key_as_string "true"/"false")
+        blindspot = bool(blindspot)
+    stats = bucket.get("relevance", {})
+    pct = bucket.get("relevance_pct", {}).get("values", {})
+    doc = {
+        "interval": interval,
+        "bucket_start": start_ms,
+        "bucket_end": end_ms,
+        "complete": end_ms <= now_ms,
+        "action": key["action"],
+        "experience_grade": key["experience_grade"],
+        "blindspot_triggered": blindspot,
+        "event_count": bucket["doc_count"],
+        "relevance_count": stats.get("count", 0),
+        "relevance_sum": stats.get("sum", 0.0),
+        "relevance_avg": stats.get("avg"),
+        "relevance_min": stats.get("min"),
+        "relevance_max": stats.get("max"),
+        **{f"relevance_p{p}": pct.get(f"{float(p)}") for p in ROLLUP_PERCENTS},
+        "rolled_up_at": rolled_up_at,
+    }
+    identity = json.dumps([interval, start_ms, key["action"], key["experience_grade"], blindspot])
+    return hashlib.sha1(identity.encode()).hexdigest(), doc
+
+
+@mcp.tool()
+@_admission
+async def rollup_access_log(backfill_days: int = 0) -> str:
+    """Fold memory-access-log into hourly and daily summary documents.
+
+    Writes counts per action/experience_grade/blindspot_triggered and relevance
+    stats/percentiles to memory-access-rollups, which outlives the 30-day
+    access-log ILM. Runs on the scheduler; call manually to backfill.
+
+    Args:
+        backfill_days: Re-roll this many days of history (max 29). 0 = default lookback.
+    """
+    now = datetime.now(timezone.utc)
+    now_ms = int(now.timestamp() * 1000)
+    backfill = min(max(backfill_days, 0), ROLLUP_MAX_LOOKBACK_DAYS) * 86400
+
+    actions = []
+    per_interval = {}
+    errors = []
+    for interval, lookback in ROLLUP_LOOKBACK.items():
+        lookback = min(max(lookback, backfill), ROLLUP_MAX_LOOKBACK_DAYS * 86400)
+        step = _ROLLUP_INTERVAL_SECONDS[interval]
+        since_ms = (now_ms // 1000 - lookback) // step * step * 1000  # align to bucket start
+        try:
+            buckets = await _es_composite(
+                ROLLUP_SOURCE_INDEX, None, _ROLLUP_AGGS,
+                sources=[{"bucket": {"date_histogram": {
+                    "field": "timestamp", "calendar_interval": f"1{interval[0]}",
+                }}}] + _ROLLUP_SOURCES,
+                query={"range": {"timestamp": {"gte": since_ms, "format": "epoch_millis"}}},
+            )
+        except Exception as e:
+            logger.error("rollup: %s aggregation failed: %s", interval, e)
+            errors.append(f"{interval}: {_safe_error(e)}")
+            continue
+        for bucket in buckets:
+            doc_id, doc = _rollup_doc(interval, bucket, now_ms, now.isoformat())
+            actions.append(({"index": {"_index": ROLLUP_INDEX, "_id": doc_id}}, doc))
+        per_interval[interval] = {
+            "since": datetime.fromtimestamp(since_ms / 1000, timezone.utc).isoformat(),
+            "rollup_docs": len(buckets),
+            "events": sum(b["doc_count"] for b in buckets),
+        }
+
+    written = 0
+    if actions:
+        try:
+            report = await _bulk_write(actions)
+            written = report["succeeded"]
+            errors.extend(_bulk_error_summary("rollup", report))
+        except Exception as e:
+            logger.error("rollup: bulk write failed: %s", e)
+            errors.append(f"rollup bulk: {_safe_error(e)}")
+
+    summary = f"Rolled up access log: {written}/{len(actions)} rollup docs written"
+    if errors:
+        summary += f" ({len(errors)} errors)"
+    return json.dumps({
+        "summary": summary, "intervals": per_interval, "errors": errors,
+    }, ensure_ascii=False)
+
+
+# ─── MCP Tool 10: manage_entity_catalog ────────────────────────
+
+_CATALOG_REWRITE_SCRIPT = (
+    "if (ctx._source[params.alias_field] == null) {"
+    " ctx._source[params.alias_field] = ctx._source[params.field]; }"
+    " ctx._source[params.field] = params.canonical;"
+    " ctx._source.content = ctx._source.entity + ' ' + ctx._source.attribute + ' ' + ctx._source.value;"
+)
+
+
+def _catalog_public(entry: dict) -> dict:
+    return {k: entry.get(k) for k in _CATALOG_FIELDS}
+
+
+def _catalog_drop(field: str, names: list[str], now: str):
+    """Mutation: remove names from one list field (None if the entry is gone)."""
+    def mutate(doc: dict | None) -> dict | None:
+        if doc is None:
+            return None
+        doc[field] = [n for n in doc.get(field, []) if n not in names]
+        doc["updated_at"] = now
+        return doc
+    return mutate
+
+
+async def _catalog_merge(kind: str, source_canonical: str, target_canonical: str, now: str) -> list[str]:
+    """Move source's names into target's aliases and delete source. Returns the moved names."""
+    source_id = _catalog_doc_id(kind, source_canonical)
+    for _ in range(CATALOG_WRITE_RETRIES):
+        stored = await _es_get_document(CATALOG_INDEX, source_id)
+        with _catalog_lock:
+            local = _catalog[kind].get(source_canonical, {})
+            aliases = list(local.get("aliases", []))
+        if stored:
+            aliases += [a for a in stored["_source"].get("aliases", []) if a not in aliases]
+        moved = [source_canonical, *aliases]
+
+        def mutate(doc: dict | None) -> dict | None:
+            if doc is None:
+                return None
+            doc["aliases"] = doc.get("aliases", []) + [m for m in moved if m not in doc.get("aliases", [])]
+            doc["review"] = [a for a in doc.get("review", []) if a not in moved]
+            doc["similar"] = [c for c in doc.get("similar", []) if c != source_canonical]
+            doc["updated_at"] = now
+            return doc
+
+        if await _catalog_write(kind, target_canonical, mutate) is None:
+            raise RuntimeError(f"canonical {kind} '{target_canonical}' is no longer in the catalog")
+        if stored is None:
+            return moved
+        report = await _bulk_write([({"delete": {
+            "_index": CATALOG_INDEX, "_id": source_id,
+            "if_seq_no": stored["_seq_no"], "if_primary_term": stored["_primary_term"],
+        }}, None)])
+        failures = [f for f in report["failures"] if f["status"] != 404]
+        if not failures:
+            return moved
+        if failures[0]["status"] != 409:
+            raise RuntimeError(f"catalog delete of {kind} '{source_canonical}' failed: {failures[0]}")
+        # source gained aliases meanwhile — move those too
+    raise RuntimeError(f"catalog merge of {kind} '{source_canonical}' kept conflicting")
+
+
+@mcp.tool()
+@_admission
+async def manage_entity_catalog(
+    action: str = "list",
+    kind: str = "entity",
+    name: str = "",
+    canonical: str = "",
+    rewrite_existing: bool = False,
+) -> str:
+    """Inspect and curate the canonical entity/attribute name catalog.
+
+    New memories are stored under the canonical name of their entity and
+    attribute ("Payment_Service" → "payment-service"); the spelling given is
+    kept in entity_alias / attribute_alias. Only case/separator variants are
+    aliased automatically; look-alikes ("payment-svc") are suggested for review.
+
+    Args:
+        action: "list" (entries, optionally filtered by name), "review" (new aliases
+            and look-alike suggestions awaiting a decision), "resolve" (what name maps
+            to, without changing anything), "merge" (fold name and its aliases into
+            canonical), "approve" (accept name's alias, or dismiss its suggestions)
+            or "split" (detach alias name into its own canonical entry)
+        kind: "entity" or "attribute"
+        name: Name to resolve / merge / approve / split
+        canonical: Target canonical name for merge
+        rewrite_existing: merge only — also rename existing semantic memories
+            (background update-by-query, see manage_background_tasks)
+    """
+    if kind not in CATALOG_KINDS:
+        return json.dumps({"error": f"kind must be one of {', '.join(CATALOG_KINDS)}"})
+    if action not in ("list", "review", "resolve", "merge", "approve", "split"):
+        return json.dumps({"error": f"unknown action '{action}' (list|review|resolve|merge|approve|split)"})
+    if action not in ("list", "review") and not name.strip():
+        return json.dumps({"error": f"name is required for {action}"})
+    if len(name) > MAX_FIELD_LENGTH or len(canonical) > MAX_FIELD_LENGTH:
+        return json.dumps({"error": f"name exceeds {MAX_FIELD_LENGTH} characters"})
+    try:
+        ready = await _catalog_ensure_loaded()
+    except Exception as e:
+        logger.error("catalog: load failed: %s", e)
+        return json.dumps({"error": f"catalog unavailable: {_safe_error(e)}"})
+    if not ready:
+        return json.dumps({"error": "catalog is being seeded, try again shortly"})
+
+    key = _catalog_key(name) if name else ""
+    now = datetime.now(timezone.utc).isoformat()
+
+    if action in ("list", "review"):
+        with _catalog_lock:
+            entries = [_catalog_public(e) for e in _catalog[kind].values()]
+        if key:
+            entries = [e for e in entries if key in e["canonical"] or any(key in a for a in e["aliases"])]
+        if action == "review":
+            entries = [e for e in entries if e["review"] or e["similar"]]
+        entries.sort(key=lambda e: e["canonical"])
+        return json.dumps({
+            "summary": f"{len(entries)} {kind} entries" + (" awaiting review" if action == "review" else ""),
+            "entries": entries[:CATALOG_LIST_LIMIT],
+            "truncated": len(entries) > CATALOG_LIST_LIMIT,
+        }, ensure_ascii=False)
+
+    if action == "resolve":
+        with _catalog_lock:
+            target = _catalog_alias[kind].get(key)
+            variant = _catalog_folded[kind].get(_catalog_fold(key))
+            candidates = [] if target else _catalog_candidates_locked(kind, key)[:5]
+        if target:
+            return json.dumps({"name": key, "canonical": target,
+                               "match": "exact" if target == key else "alias"}, ensure_ascii=False)
+        return json.dumps({
+            "name": key, "canonical": variant or key, "match": "variant" if variant else "new",
+            "candidates": candidates,
+        }, ensure_ascii=False)
+
+    with _catalog_lock:
+        source_canonical = _catalog_alias[kind].get(key)
+        entry = _catalog[kind].get(source_canonical) if source_canonical else None
+        target_canonical = _catalog_alias[kind].get(_catalog_key(canonical)) if canonical else None
+    if entry is None:
+        return json.dumps({"error": f"{kind} '{key}' is not in the catalog"})
+
+    try:
+        if action == "approve":
+            in_review = key in entry["review"]
+            await _catalog_write(kind, source_canonical, _catalog_drop(
+                "review" if in_review else "similar", [key] if in_review else entry["similar"], now))
+            result = (f"'{key}' confirmed as alias of '{source_canonical}'" if in_review
+                      else f"suggestions for '{source_canonical}' dismissed")
+
+        elif action == "split":
+            if key == source_canonical:
+                return json.dumps({"error": f"'{key}' is a canonical name, not an alias"})
+            await _catalog_write(kind, source_canonical, lambda doc: doc and _catalog_drop(
+                "review", [key], now)(_catalog_drop("aliases", [key], now)(doc)))
+            await _catalog_write(kind, key, _catalog_upsert({
+                "kind": kind, "canonical": key, "aliases": [], "review": [],
+                "similar": [source_canonical], "source": "split",
+                "created_at": now, "updated_at": now,
+            }))
+            with _catalog_lock:
+                _catalog_rebuild_locked(kind)
+            result = f"'{key}' split from '{source_canonical}'"
+
+        else:  # merge
+            if target_canonical is None:
+                return json.dumps({"error": f"canonical {kind} '{_catalog_key(canonical)}' is not in the catalog"})
+            if target_canonical == source_canonical:
+                return json.dumps({"error": f"'{key}' already resolves to '{target_canonical}'"})
+            moved = await _catalog_merge(kind, source_canonical, target_canonical, now)
+            with _catalog_lock:
+                _catalog[kind].pop(source_canonical, None)
+                referencing = [c for c, e in _catalog[kind].items() if source_canonical in e["similar"]]
+                _catalog_rebuild_locked(kind)
+            await _catalog_persist([(kind, c, _catalog_drop("similar", [source_canonical], now))
+                                    for c in referencing])
+            result = f"merged {len(moved)} name(s) into '{target_canonical}'"
+    except Exception as e:
+        logger.error("catalog: %s failed: %s", action, e)
+        return json.dumps({"error": f"catalog {action} failed: {_safe_error(e)}"})
+
+    response: dict = {"summary": result}
+    if action == "merge" and rewrite_existing:
+        try:
+            response["rewrite"] = await _submit_es_task(
+                "update_by_query", "semantic-memories",
+                {
+                    "query": {"terms": {kind: moved}},
+                    "script": {"lang": "painless", "source": _CATALOG_REWRITE_SCRIPT, "params": {
+                        "field": kind, "alias_field": f"{kind}_alias", "canonical": target_canonical,
+                    }},
+                },
+                description=f"catalog merge {kind} → {target_canonical}",
+            )
+        except Exception as e:
+            logger.error("catalog: rewrite of existing memories failed: %s", e)
+            response["rewrite"] = {"status": "error", "message": _safe_error(e)}
+    return json.dumps(response, ensure_ascii=False)
+
+
+# ─── Scheduler Leases (leader election) ────────────────────────
+# A lease is held only while a job runs: a short TTL (LEASE_TTL_SECONDS)
+# is renewed by a heartbeat on the background loop, and released when the
+# run ends. last_run on the lease doc de-duplicates runs across replicas:
+# a replica whose timer fires within LEASE_INTERVAL_RATIO × interval of the
+# last completed run skips it. The destructive domain sync takes the
+# "sync_knowledge_domains" lease however it is reached (sync thread,
+# post-reflect chain or a manual call).
+
+LEASE_INDEX = "scheduler-leases"
+SCHEDULER_LEASE_ENABLED = os.getenv("SCHEDULER_LEASE_ENABLED", "true").lower() == "true"
+LEASE_TTL_SECONDS = float(os.getenv("LEASE_TTL_SECONDS", "60"))  # renewed every TTL / 3 while running
+LEASE_INTERVAL_RATIO = float(os.getenv("LEASE_INTERVAL_RATIO", "0.9"))  # skip if last run < interval × ratio ago
+REPLICA_ID = os.getenv("REPLICA_ID") or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+SYNC_LEASE = "sync_knowledge_domains"
+
+# (job, fencing token) held by the current scheduled run, if any
+_current_lease: contextvars.ContextVar[tuple[str, int] | None] = contextvars.ContextVar("current_lease", default=None)
+
+# Jobs running in this process (the same replica must not run a job twice at once)
+_held_leases: set[str] = set()
+_held_leases_lock = threading.Lock()
+
+
+def _ran_recently(src: dict, min_interval: float) -> bool:
+    if not min_interval or not src.get("last_run"):
+        return False
+    try:
+        last_run = datetime.fromisoformat(src["last_run"])
+    except ValueError:
+        return False
+    return (datetime.now(timezone.utc) - last_run).total_seconds() < min_interval
+
+
+async def _acquire_lease(job: str, min_interval: float = 0) -> int | None:
+    """Take the lease for job if it is free/expired and job didn't run within min_interval.
+
+    Uses if_seq_no/if_primary_term so only one replica wins a race.
+    Returns the new fencing token, or None if the job should not run here now.
+    """
+    now_ms = int(time.time() * 1000)
+    doc = {
+        "job": job,
+        "holder": REPLICA_ID,
+        "acquired_at": datetime.now(timezone.utc).isoformat(),
+        "expires_at": now_ms + int(LEASE_TTL_SECONDS * 1000),
+    }
+    current = await _es_get_document(LEASE_INDEX, job)
+    if current is None:
+        doc["fencing_token"] = 1
+        status = await _es_put_document(LEASE_INDEX, job, doc, create=True)
+    else:
+        src = current.get("_source", {})
+        # An unexpired lease of our own replica is stale (restart with a fixed REPLICA_ID)
+        if src.get("holder") != REPLICA_ID and int(src.get("expires_at", 0)) > now_ms:
+            return None
+        if _ran_recently(src, min_interval):
+            logger.info("[scheduler] %s skipped — ran at %s", job, src["last_run"])
+            return None
+        doc["fencing_token"] = int(src.get("fencing_token", 0)) + 1
+        if src.get("last_run"):
+            doc["last_run"] = src["last_run"]
+        status = await _es_put_document(
+            LEASE_INDEX, job, doc,
+            if_seq_no=current["_seq_no"], if_primary_term=current["_primary_term"],
+        )
+    if status in (200, 201):
+        return doc["fencing_token"]
+    if status == 409:
+        return None
+    raise RuntimeError(f"lease write for {job} failed HTTP {status}")
+
+
+async def _update_lease(job: str, token: int, **fields) -> bool:
+    """Rewrite our lease (token unchanged) with fields. False if it was lost."""
+    current = await _es_get_document(LEASE_INDEX, job)
+    src = (current or {}).get("_source", {})
+    if src.get("holder") != REPLICA_ID or src.get("fencing_token") != token:
+        return False
+    status = await _es_put_document(
+        LEASE_INDEX, job, dict(src, **fields),
+        if_seq_no=current["_seq_no"], if_primary_term=current["_primary_term"],
+    )
+    return status in (200, 201)
+
+
+async def _lease_heartbeat(job: str, token: int) -> None:
+    """Extend the lease every LEASE_TTL_SECONDS / 3 until cancelled."""
+    while True:
+        await asyncio.sleep(LEASE_TTL_SECONDS / 3)
+        try:
+            renewed = await _update_lease(
+                job, token, expires_at=int(time.time() * 1000) + int(LEASE_TTL_SECONDS * 1000),
+            )
+        except Exception as e:
+            logger.warning("lease: %s renewal failed: %s", job, e)
+            continue
+        if not renewed:
+            logger.error("lease: %s lost (token %d) — fencing checks will stop destructive steps", job, token)
+            return
+
+
+@contextlib.asynccontextmanager
+async def _job_lease(job: str, min_interval: float = 0):
+    """Hold job's lease for the duration of the block; yields False if the job must not run.
+
+    On exit the lease is released, stamping last_run when the block completed.
+    """
+    with _held_leases_lock:
+        busy = job in _held_leases
+        _held_leases.add(job)
+    if busy:
+        logger.info("[scheduler] %s skipped — already running in this process", job)
+        yield False
+        return
+    try:
+        if not SCHEDULER_LEASE_ENABLED:
+            yield True
+            return
+        try:
+            token = await _acquire_lease(job, min_interval)
+        except Exception as e:
+            logger.error("[scheduler] %s lease acquisition failed: %s", job, e)
+            token = None
+        if token is None:
+            yield False
+            return
+        logger.info("[scheduler] %s lease acquired by %s (token %d)", job, REPLICA_ID, token)
+        heartbeat = _run_in_background(_lease_heartbeat(job, token))
+        lease_token = _current_lease.set((job, token))
+        completed = False
+        try:
+            yield True
+            completed = True
+        finally:
+            heartbeat.cancel()
+            _current_lease.reset(lease_token)
+            release = {"expires_at": int(time.time() * 1000)}
+            if completed:
+                release["last_run"] = datetime.now(timezone.utc).isoformat()
+            try:
+                await _update_lease(job, token, **release)
+            except Exception as e:
+                logger.warning("[scheduler] %s lease release failed: %s", job, e)
+    finally:
+        with _held_leases_lock:
+            _held_leases.discard(job)
+
+
+async def _lease_still_held() -> bool:
+    """Fencing check before destructive steps. True outside scheduled runs."""
+    lease = _current_lease.get()
+    if lease is None:
+        return True
+    job, token = lease
+    try:
+        current = await _es_get_document(LEASE_INDEX, job)
+    except Exception as e:
+        logger.error("lease: fencing check for %s failed: %s", job, e)
+        return False
+    src = (current or {}).get("_source", {})
+    return (
+        src.get("holder") == REPLICA_ID
+        and src.get("fencing_token") == token
+        and int(src.get("expires_at", 0)) > int(time.time() * 1000)
+    )
+
+
 # ─── Background Scheduler ──────────────────────────────────────
 
+async def _scheduled_run(name: str, coro_fn, interval: float) -> str | None:
+    """One scheduled run under the job lease. None if skipped."""
+    with _write_scope():  # per job: its later reads see its writes
+        async with _job_lease(name, interval * LEASE_INTERVAL_RATIO) as held:
+            if not held:
+                return None
+            logger.info("[scheduler] %s starting", name)
+            return await coro_fn()
+
+
+async def _scheduled_reflect_then_sync(interval: float) -> tuple[str | None, str | None]:
+    """Reflect under its lease, then sync (which takes the shared sync lease itself)."""
+    with _write_scope():  # sync reads what reflect just wrote from the primary
+        result = await _scheduled_run("reflect_consolidate", reflect_consolidate, interval)
+        if result is None:
+            return None, None
+        _log_scheduled_result("reflect_consolidate", result)
+        logger.info("[scheduler] post-reflect sync_knowledge_domains starting")
+        return result, await sync_knowledge_domains()
+
+
+def _log_scheduled_result(name: str, result: str) -> None:
+    """Log a scheduled tool call's outcome; rejections and errors are not successes."""
+    try:
+        data = json.loads(result)
+    except ValueError:
+        data = {}
+    if data.get("status") == 429:
+        logger.warning("[scheduler] %s rejected by admission control (%s), retrying next interval",
+                       name, data.get("reason"))
+    elif "error" in data:
+        logger.error("[scheduler] %s failed: %s", name, data["error"])
+    else:
+        logger.info("[scheduler] %s complete: %s", name, data.get("summary", "ok"))
+
+
 def _run_scheduler():
-    """Run reflect/blindspot/sync periodically in daemon threads."""
+    """Run reflect/blindspot/sync/rollup periodically in daemon threads.
+
+    With several replicas, each job only runs on the replica that holds its
+    lease in scheduler-leases; the others skip and keep serving.
+    """
 
     def _run_task(name, coro_fn, interval):
         """Loop that runs coro_fn every interval seconds. Each thread uses its own event loop."""
         loop = asyncio.new_event_loop()
+        _request_identity.set(SCHEDULER_IDENTITY)
         while True:
             time.sleep(interval)
             try:
-                logger.info("[scheduler] %s starting", name)
-                result = loop.run_until_complete(coro_fn())
-                parsed = json.loads(result)
-                logger.info("[scheduler] %s complete: %s", name, parsed.get("summary", "ok"))
+                with _span(f"scheduler.{name}", **{"scheduler.replica": REPLICA_ID}):
+                    result = loop.run_until_complete(_scheduled_run(name, coro_fn, interval))
+                if result is not None:
+                    _log_scheduled_result(name, result)
             except Exception as e:
                 logger.error("[scheduler] %s failed: %s", name, e)
 
     def _run_reflect_then_sync(interval):
         """Run reflect followed by automatic sync. Separate thread."""
         loop = asyncio.new_event_loop()
+        _request_identity.set(SCHEDULER_IDENTITY)
         while True:
             time.sleep(interval)
             try:
-                logger.info("[scheduler] reflect_consolidate starting")
-                result = loop.run_until_complete(reflect_consolidate())
-                parsed = json.loads(result)
-                logger.info("[scheduler] reflect_consolidate complete: %s", parsed.get("summary", "ok"))
-
-                # Auto sync after reflect
-                logger.info("[scheduler] post-reflect sync_knowledge_domains starting")
-                sync_result = loop.run_until_complete(sync_knowledge_domains())
-                sync_parsed = json.loads(sync_result)
-                logger.info("[scheduler] sync complete: %s", sync_parsed.get("summary", "ok"))
+                with _span("scheduler.reflect_then_sync", **{"scheduler.replica": REPLICA_ID}):
+                    _, sync_result = loop.run_until_complete(_scheduled_reflect_then_sync(interval))
+                if sync_result is not None:
+                    _log_scheduled_result("sync_knowledge_domains", sync_result)
             except Exception as e:
                 logger.error("[scheduler] reflect+sync failed: %s", e)
 
@@ -991,74 +4211,258 @@ def _run_scheduler():
         args=("sync_knowledge_domains", sync_knowledge_domains, SYNC_INTERVAL),
         daemon=True,
     )
+    rollup_thread = threading.Thread(
+        target=_run_task,
+        args=("rollup_access_log", rollup_access_log, ROLLUP_INTERVAL),
+        daemon=True,
+    )
 
     reflect_thread.start()
     blindspot_thread.start()
     sync_thread.start()
+    rollup_thread.start()
     logger.info(
-        "[scheduler] started — reflect: %ds, blindspot: %ds, sync: %ds",
-        REFLECT_INTERVAL, BLINDSPOT_INTERVAL, SYNC_INTERVAL,
+        "[scheduler] started — reflect: %ds, blindspot: %ds, sync: %ds, rollup: %ds (replica %s, leases %s)",
+        REFLECT_INTERVAL, BLINDSPOT_INTERVAL, SYNC_INTERVAL, ROLLUP_INTERVAL,
+        REPLICA_ID, "on" if SCHEDULER_LEASE_ENABLED else "off",
+    )
+
+
+# ─── Cold-Start Warmup / Readiness ─────────────────────────────
+# Cloud Run scales to zero: the first request after a cold start used to pay
+# TLS setup, the ELSER model load and the first domain scan. Warmup does that
+# work at startup; /readyz reports 503 until it has finished.
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "4"))
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "2"))
+WARMUP_RETRY_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "30"))
+ELSER_INFERENCE_ID = os.getenv("ELSER_INFERENCE_ID", ".elser-2-elastic")
+
+# Readiness needs these; the rest are recreated by sync / on first lease write
+WARMUP_REQUIRED_INDICES = ("episodic-memories", "semantic-memories",
+                           "knowledge-domains-staging", "memory-access-log")
+
+_warmup_state: dict = {"ready": not WARMUP_ENABLED, "attempts": 0, "steps": {}}
+_warmup_task: asyncio.Task | None = None
+_dedup_warm_task: asyncio.Task | None = None
+
+
+async def _warmup_step(name: str, coro) -> object:
+    """Run one warmup step, recording status and duration in _warmup_state."""
+    started = time.perf_counter()
+    try:
+        result = await coro
+    except Exception as e:
+        _warmup_state["steps"][name] = {
+            "status": "error", "error": _safe_error(e),
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        raise
+    _warmup_state["steps"][name] = {
+        "status": "ok", "ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    return result
+
+
+async def _warm_connections() -> None:
+    """Open WARMUP_CONNECTIONS keep-alive connections in the shared pool."""
+    resps = await asyncio.gather(*(
+        _es_request("GET", "/", "ping", record_slow=False) for _ in range(WARMUP_CONNECTIONS)
+    ))
+    for resp in resps:
+        resp.raise_for_status()
+
+
+async def _check_indices() -> list[str]:
+    """Check ALLOWED_INDICES exist. Raises if a required index is missing."""
+    names = sorted(ALLOWED_INDICES)
+    exists = await asyncio.gather(*(_es_index_exists(i) for i in names))
+    missing = [name for name, ok in zip(names, exists) if not ok]
+    _warmup_state["missing_indices"] = missing
+    required_missing = [i for i in missing if i in WARMUP_REQUIRED_INDICES]
+    if required_missing:
+        raise RuntimeError(f"required indices missing: {', '.join(required_missing)}")
+    return missing
+
+
+async def _prime_inference() -> None:
+    """Send a one-word input so the ELSER deployment is allocated before real traffic."""
+    resp = await _es_request(
+        "POST", f"/_inference/{ELSER_INFERENCE_ID}", "inference",
+        body=json.dumps({"input": ["warmup"]}), timeout=120, record_slow=False,
     )
+    resp.raise_for_status()
+
+
+async def _warmup() -> None:
+    """Warm the process until ES answers. Only connection/index failures are retried;
+    ELSER, the domain table and the entity catalog are best-effort. The dedup
+    index is loaded in the background once ready."""
+    delay = WARMUP_RETRY_SECONDS
+    _warmup_state["started_at"] = datetime.now(timezone.utc).isoformat()
+    with _span("warmup"):
+        while True:
+            _warmup_state["attempts"] += 1
+            try:
+                await _warmup_step("connections", _warm_connections())
+                missing = await _warmup_step("indices", _check_indices())
+                break
+            except Exception as e:
+                logger.warning(
+                    "warmup: attempt %d failed (%s), retrying in %.0fs",
+                    _warmup_state["attempts"], e, delay,
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+        if missing:
+            logger.warning("warmup: optional indices missing: %s", ", ".join(missing))
+
+        if "read" in _ES_ENDPOINTS:
+            endpoints = await _warmup_step("endpoints", _check_endpoints())
+            if not endpoints["read"]["healthy"]:
+                logger.warning("warmup: read endpoint unhealthy (%s), reads use the primary",
+                               endpoints["read"]["error"])
+
+        try:
+            await _warmup_step("inference", _prime_inference())
+        except Exception as e:
+            logger.warning("warmup: ELSER priming failed: %s", e)
+        try:
+            await _warmup_step("domains", _refresh_blindspot_cache())
+        except Exception as e:
+            logger.warning("warmup: domain table load failed: %s", e)
+        if CATALOG_ENABLED:
+            try:
+                await _warmup_step("catalog", _catalog_ensure_loaded())
+            except Exception as e:
+                logger.warning("warmup: entity catalog load failed: %s", e)
+        if CLOUD_RUN_URL:
+            await _warmup_step("oidc", asyncio.to_thread(
+                importlib.import_module, "google.auth.transport.requests",
+            ))
+
+    _warmup_state["finished_at"] = datetime.now(timezone.utc).isoformat()
+    _warmup_state["ready"] = True
+    logger.info("warmup: ready after %d attempt(s) — %s", _warmup_state["attempts"], {
+        name: step["status"] for name, step in _warmup_state["steps"].items()
+    })
+
+    # Up to DEDUP_MAX_ENTRIES signatures: loaded while serving, not before.
+    # Duplicates of episodes not loaded yet are indexed as new ones meanwhile.
+    global _dedup_warm_task
+    _dedup_warm_task = asyncio.get_running_loop().create_task(_warm_dedup_index())
+
+
+async def _warm_dedup_index() -> None:
+    try:
+        await _warmup_step("dedup", _dedup_warm())
+    except Exception as e:
+        logger.warning("warmup: dedup index load failed: %s", e)
+
+
+def _start_warmup() -> None:
+    """Schedule warmup on the serving event loop (called at ASGI lifespan startup)."""
+    global _warmup_task
+    if WARMUP_ENABLED and _warmup_task is None:
+        _warmup_task = asyncio.get_running_loop().create_task(_warmup())
 
 
 MCP_AUTH_TOKEN = os.getenv("MCP_AUTH_TOKEN")
 CLOUD_RUN_URL = os.getenv("CLOUD_RUN_URL", "")
 
 
-def _verify_auth(auth_header: str) -> bool:
-    """Verify Bearer token or Google OIDC ID Token."""
+def _verify_auth(auth_header: str) -> str | None:
+    """Verify Bearer token or Google OIDC ID Token.
+
+    Returns the caller identity (admission control key), or None if unauthorized.
+    """
     if not auth_header.startswith("Bearer "):
-        return False
+        return None
     token = auth_header[7:]
 
     # 1) Static Bearer token match
     if MCP_AUTH_TOKEN and token == MCP_AUTH_TOKEN:
-        return True
+        return "static-token"
 
     # 2) Google OIDC ID Token verification (for Cloud Scheduler)
     if CLOUD_RUN_URL:
         try:
             from google.oauth2 import id_token as google_id_token
             from google.auth.transport import requests as google_requests
-            google_id_token.verify_oauth2_token(
+            claims = google_id_token.verify_oauth2_token(
                 token, google_requests.Request(), audience=CLOUD_RUN_URL,
             )
-            return True
+            return f"oidc:{claims.get('email') or claims.get('sub', 'unknown')}"
         except Exception as e:
             logger.warning("OIDC verification failed: %s", e)
 
-    return False
-
-
-if __name__ == "__main__":
-    if SCHEDULER_ENABLED:
-        _run_scheduler()
+    return None
 
-    if MCP_AUTH_TOKEN or CLOUD_RUN_URL:
-        import uvicorn
-        from starlette.responses import JSONResponse as _JSONResp
 
-        inner_app = mcp.streamable_http_app()
+def _build_app():
+    """ASGI app: health probes, optional auth, and warmup at lifespan startup.
 
-        async def auth_app(scope, receive, send):
-            if scope["type"] == "http":
+    /healthz (liveness) and /readyz (readiness) bypass auth so Cloud Run
+    startup probes and docker healthchecks can reach them.
+    """
+    from starlette.responses import JSONResponse
+
+    inner_app = mcp.streamable_http_app()
+    auth_enabled = bool(MCP_AUTH_TOKEN or CLOUD_RUN_URL)
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            async def lifespan_receive():
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    _start_warmup()
+                return message
+            await inner_app(scope, lifespan_receive, send)
+            return
+
+        if scope["type"] == "http":
+            path = scope.get("path", "")
+            if path == "/healthz":
+                await JSONResponse({"status": "ok"})(scope, receive, send)
+                return
+            if path == "/readyz":
+                ready = _warmup_state["ready"]
+                resp = JSONResponse(
+                    {"status": "ready" if ready else "warming", **_warmup_state,
+                     "endpoints": _endpoint_state()},
+                    status_code=200 if ready else 503,
+                )
+                await resp(scope, receive, send)
+                return
+            if auth_enabled:
                 headers = dict(scope.get("headers", []))
                 auth = headers.get(b"authorization", b"").decode()
-                if not _verify_auth(auth):
-                    resp = _JSONResp(
+                identity = _verify_auth(auth)
+                if identity is None:
+                    resp = JSONResponse(
                         {"jsonrpc": "2.0", "id": None,
                          "error": {"code": -32000, "message": "Unauthorized"}},
                         status_code=401,
                     )
                     await resp(scope, receive, send)
                     return
-            await inner_app(scope, receive, send)
+                _request_identity.set(identity)
+        await inner_app(scope, receive, send)
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    if SCHEDULER_ENABLED:
+        _run_scheduler()
 
+    if MCP_AUTH_TOKEN or CLOUD_RUN_URL:
         logger.info("Auth enabled — Bearer token or OIDC required")
-        uvicorn.run(
-            auth_app,
-            host="0.0.0.0",
-            port=int(os.getenv("PORT", "8080")),
-        )
-    else:
-        mcp.run(transport="streamable-http")
+    uvicorn.run(
+        _build_app(),
+        host=mcp.settings.host,
+        port=mcp.settings.port,
+    )
@@ -38,23 +38,86 @@ create_index() {
   fi
 }
 
+# Rollover-managed index: index template (mappings from the indices/ file +
+# rollover alias) and a first backing index <alias>-000001 behind a write
+# alias named <alias>. ILM (02-ilm-policies.sh) rolls it over by size/age.
+create_rollover_index() {
+  local alias_name="$1"
+  local json_file="$2"
+
+  echo -n "Creating index template: ${alias_name} ... "
+  python3 -c "
+import json, sys
+src = json.load(open(sys.argv[1]))
+settings = dict(src.get('settings', {}))
+settings['index.lifecycle.rollover_alias'] = sys.argv[2]
+print(json.dumps({
+    'index_patterns': [sys.argv[2] + '-*'],
+    'priority': 200,
+    'template': {'settings': settings, 'mappings': src['mappings']},
+}, ensure_ascii=False))" "${json_file}" "${alias_name}" > /tmp/index_template.json
+
+  local http_code
+  http_code=$(curl -s -o /tmp/index_template_response.json -w "%{http_code}" \
+    -X PUT "${ES_URL}/_index_template/${alias_name}" \
+    -H "Content-Type: application/json" \
+    -H "Authorization: ApiKey ${ES_API_KEY}" \
+    -d @/tmp/index_template.json)
+  if [ "$http_code" -ge 200 ] && [ "$http_code" -lt 300 ]; then
+    echo "OK ($http_code)"
+  else
+    echo "FAILED ($http_code)"
+    cat /tmp/index_template_response.json; echo ""
+    return 1
+  fi
+
+  echo -n "Creating write alias: ${alias_name} → ${alias_name}-000001 ... "
+  http_code=$(curl -s -o /dev/null -w "%{http_code}" -X GET "${ES_URL}/_alias/${alias_name}" \
+    -H "Authorization: ApiKey ${ES_API_KEY}")
+  if [ "$http_code" -eq 200 ]; then
+    echo "ALREADY EXISTS — skipped"
+    return 0
+  fi
+  http_code=$(curl -s -o /dev/null -w "%{http_code}" -I "${ES_URL}/${alias_name}" \
+    -H "Authorization: ApiKey ${ES_API_KEY}")
+  if [ "$http_code" -eq 200 ]; then
+    echo "SKIPPED — '${alias_name}' is a plain index; run setup/09-migrate-rollover.sh"
+    return 0
+  fi
+  http_code=$(curl -s -o /tmp/index_template_response.json -w "%{http_code}" \
+    -X PUT "${ES_URL}/${alias_name}-000001" \
+    -H "Content-Type: application/json" \
+    -H "Authorization: ApiKey ${ES_API_KEY}" \
+    -d "{\"aliases\": {\"${alias_name}\": {\"is_write_index\": true}}}")
+  if [ "$http_code" -ge 200 ] && [ "$http_code" -lt 300 ]; then
+    echo "OK ($http_code)"
+  else
+    echo "FAILED ($http_code)"
+    cat /tmp/index_template_response.json; echo ""
+    return 1
+  fi
+}
+
 echo "=== Hippocampus Index Setup ==="
 echo "ES_URL: ${ES_URL}"
 echo ""
 
 ERRORS=0
 
-create_index "episodic-memories"    "${INDICES_DIR}/episodic-memories.json"    || ((ERRORS++))
+create_rollover_index "episodic-memories" "${INDICES_DIR}/episodic-memories.json" || ((ERRORS++))
 create_index "semantic-memories"    "${INDICES_DIR}/semantic-memories.json"    || ((ERRORS++))
 create_index "memory-associations"  "${INDICES_DIR}/memory-associations.json"  || ((ERRORS++))
-create_index "memory-access-log"    "${INDICES_DIR}/memory-access-log.json"    || ((ERRORS++))
+create_rollover_index "memory-access-log" "${INDICES_DIR}/memory-access-log.json" || ((ERRORS++))
 create_index "knowledge-domains"    "${INDICES_DIR}/knowledge-domains.json"    || ((ERRORS++))
 create_index "knowledge-domains-staging" "${INDICES_DIR}/knowledge-domains-staging.json" || ((ERRORS++))
+create_index "scheduler-leases"     "${INDICES_DIR}/scheduler-leases.json"     || ((ERRORS++))
+create_index "memory-access-rollups" "${INDICES_DIR}/memory-access-rollups.json" || ((ERRORS++))
+create_index "entity-catalog"       "${INDICES_DIR}/entity-catalog.json"       || ((ERRORS++))
 
 echo ""
 if [ "$ERRORS" -gt 0 ]; then
   echo "Completed with ${ERRORS} error(s)."
   exit 1
 else
-  echo "All 6 indices created successfully."
+  echo "All 9 indices created successfully."
 fi
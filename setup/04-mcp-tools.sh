@@ -2,12 +2,17 @@
 # ──────────────────────────────────────────────────────────────────
 # 04-mcp-tools.sh
 #
-# Registers 5 MCP-based tools:
+# Registers 10 MCP-based tools:
 #   - hippocampus-remember: Store experience
+#   - hippocampus-remember-batch: Store many facts from one conversation
 #   - hippocampus-reflect: Episode consolidation
 #   - hippocampus-blindspot-report: Blindspot report
 #   - hippocampus-export: Knowledge base NDJSON export
 #   - hippocampus-import: Knowledge base NDJSON import
+#   - hippocampus-slow-operations: Slow ES operation profiles
+#   - hippocampus-background-tasks: Show/cancel background ES tasks
+#   - hippocampus-rollup-access-log: Access log rollup (backfill)
+#   - hippocampus-entity-catalog: Entity/attribute name catalog curation
 #
 # Background: Elastic Workflows (Technical Preview) execution engine does not work,
 #             so workflow type was switched to mcp type.
@@ -29,13 +34,14 @@ KIBANA_URL="${KIBANA_URL:?KIBANA_URL is required. Set it in .env}"
 ES_API_KEY="${ES_API_KEY:?ES_API_KEY is required. Set it in .env}"
 MCP_SERVER_URL="${MCP_SERVER_URL:?MCP_SERVER_URL is required. Set it in .env (e.g. https://your-mcp-server.run.app/mcp)}"
 
-echo "=== Hippocampus MCP Tools (5 tools) ==="
+echo "=== Hippocampus MCP Tools (10 tools) ==="
 echo "Kibana:     ${KIBANA_URL}"
 echo "MCP Server: ${MCP_SERVER_URL}"
 echo ""
 
 # ─── Step 1: Remove existing MCP tools (if any) ───
-for tool_id in hippocampus-remember hippocampus-reflect hippocampus-blindspot-report hippocampus-export hippocampus-import; do
+for tool_id in hippocampus-remember hippocampus-remember-batch hippocampus-reflect hippocampus-blindspot-report hippocampus-export hippocampus-import \
+    hippocampus-slow-operations hippocampus-background-tasks hippocampus-rollup-access-log hippocampus-entity-catalog; do
   echo -n "Removing old tool ${tool_id} (if exists) ... "
   old_http=$(curl -s -o /dev/null -w "%{http_code}" \
     -X DELETE "${KIBANA_URL}/api/agent_builder/tools/${tool_id}" \
@@ -103,7 +109,7 @@ else
   exit 1
 fi
 
-# ─── Step 3: Register 5 MCP tools ───
+# ─── Step 3: Register 10 MCP tools ───
 
 register_tool() {
   local TOOL_ID="$1"
@@ -152,9 +158,14 @@ _TOOL_NAME="remember_memory" \
 _TOOL_DESC="Store new organizational experience as knowledge. Use after incident resolution or when user requests to save. Structures key facts as SPO triples (entity/attribute/value) and records in 3 indices. MUST display Experience Grade after saving." \
   register_tool "hippocampus-remember" "remember_memory" ""
 
+_TOOL_ID="hippocampus-remember-batch" \
+_TOOL_NAME="remember_memories_batch" \
+_TOOL_DESC="Store several facts from one conversation in a single call (e.g. postmortem wrap-up with 10-30 facts). Takes shared raw_text/external_refs and a list of SPO triples (entity/attribute/value, optional per-triple confidence/category). Validates all triples before writing and returns a result per triple. Prefer over repeated hippocampus-remember calls." \
+  register_tool "hippocampus-remember-batch" "remember_memories_batch" ""
+
 _TOOL_ID="hippocampus-reflect" \
 _TOOL_NAME="reflect_consolidate" \
-_TOOL_DESC="Consolidate episodic memories into semantic memory analysis. Use periodically or when user requests consolidation. Collects episodes with reflected=false, aggregates statistics by category, and updates domain density." \
+_TOOL_DESC="Consolidate episodic memories into semantic memory analysis. Use periodically or when user requests consolidation. Collects episodes with reflected=false, aggregates statistics by category, updates domain density, and returns scored SPO candidates (spo_candidates) to confirm via hippocampus-remember. Large results are paged: pass next_cursor back as cursor to continue." \
   register_tool "hippocampus-reflect" "reflect_consolidate" ""
 
 _TOOL_ID="hippocampus-blindspot-report" \
@@ -164,7 +175,7 @@ _TOOL_DESC="Generate a blindspot report for all knowledge domains. Use for statu
 
 _TOOL_ID="hippocampus-export" \
 _TOOL_NAME="export_knowledge_base" \
-_TOOL_DESC="Export the entire organizational knowledge base as NDJSON. Use for backup or cross-team knowledge sharing. Returns episodic/semantic/domain documents as NDJSON with _type tags." \
+_TOOL_DESC="Export the entire organizational knowledge base as NDJSON. Use for backup or cross-team knowledge sharing. Returns episodic/semantic/domain documents as NDJSON with _type tags. Output is paged: pass next_cursor back as cursor and concatenate the ndjson of every page (each page ends with a newline). Cursors expire after 10 minutes." \
   register_tool "hippocampus-export" "export_knowledge_base" ""
 
 _TOOL_ID="hippocampus-import" \
@@ -172,12 +183,37 @@ _TOOL_NAME="import_knowledge_base" \
 _TOOL_DESC="Import a knowledge base from NDJSON format. Use to restore exported data to another environment or merge team knowledge. Marks semantic duplicates as CONFLICT." \
   register_tool "hippocampus-import" "import_knowledge_base" ""
 
+_TOOL_ID="hippocampus-slow-operations" \
+_TOOL_NAME="get_slow_operations" \
+_TOOL_DESC="List recent slow Elasticsearch operations (requires ES_PROFILE_MODE=slow|all on the MCP server). Use when a tool call was slow or the user asks why. Returns per-operation latency stats and a per-shard profile breakdown, filterable by tool and minimum duration." \
+  register_tool "hippocampus-slow-operations" "get_slow_operations" ""
+
+_TOOL_ID="hippocampus-background-tasks" \
+_TOOL_NAME="manage_background_tasks" \
+_TOOL_DESC="Show or cancel long-running background Elasticsearch tasks (update/delete-by-query) started by other tools, e.g. hippocampus-reflect marking episodes reflected or a catalog merge renaming memories. action: list | status | cancel (task_id required; only the submitting identity can cancel)." \
+  register_tool "hippocampus-background-tasks" "manage_background_tasks" ""
+
+_TOOL_ID="hippocampus-rollup-access-log" \
+_TOOL_NAME="rollup_access_log" \
+_TOOL_DESC="Fold the memory access log into hourly/daily summary documents that outlive its 30-day retention. Runs on the scheduler; call only when the user asks to backfill (backfill_days up to 29)." \
+  register_tool "hippocampus-rollup-access-log" "rollup_access_log" ""
+
+_TOOL_ID="hippocampus-entity-catalog" \
+_TOOL_NAME="manage_entity_catalog" \
+_TOOL_DESC="Inspect and curate the canonical entity/attribute name catalog. Use when hippocampus-remember reports canonicalized names or suggested look-alikes, or when the user asks to merge naming variants. action: list | review | resolve (read-only) or merge | approve | split (change the catalog; confirm with the user first). merge with rewrite_existing=true also renames existing memories in the background." \
+  register_tool "hippocampus-entity-catalog" "manage_entity_catalog" ""
+
 echo ""
-echo "Done! 5 MCP tools registered successfully."
+echo "Done! 10 MCP tools registered successfully."
 echo "  Connector: ${CONNECTOR_ID} → ${MCP_SERVER_URL}"
 echo "  Tools:"
 echo "    - hippocampus-remember        (remember_memory)"
+echo "    - hippocampus-remember-batch  (remember_memories_batch)"
 echo "    - hippocampus-reflect         (reflect_consolidate)"
 echo "    - hippocampus-blindspot-report (generate_blindspot_report)"
 echo "    - hippocampus-export          (export_knowledge_base)"
 echo "    - hippocampus-import          (import_knowledge_base)"
+echo "    - hippocampus-slow-operations (get_slow_operations)"
+echo "    - hippocampus-background-tasks (manage_background_tasks)"
+echo "    - hippocampus-rollup-access-log (rollup_access_log)"
+echo "    - hippocampus-entity-catalog  (manage_entity_catalog)"
@@ -0,0 +1,110 @@
+#!/usr/bin/env bash
+# ──────────────────────────────────────────────────────────────────
+# 09-migrate-rollover.sh
+#
+# One-time migration of existing deployments to rollover-managed indices:
+#   episodic-memories, memory-access-log  (plain index → write alias)
+#
+# For each index:
+#   1. create <name>-000001 from the index template (01-indices.sh)
+#   2. reindex <name> → <name>-000001 (background task, polled)
+#   3. verify document counts match
+#   4. atomically delete the old index and point alias <name> at
+#      <name>-000001 as write index
+#
+# Stop the MCP server (or scale to zero) first: writes made during the
+# reindex would be lost at step 4. Reindexing episodic-memories re-runs
+# ELSER inference on content, so it takes a while on large indices.
+#
+# Prerequisites:
+#   - setup/01-indices.sh has created the index templates
+# ──────────────────────────────────────────────────────────────────
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+ENV_FILE="${SCRIPT_DIR}/../.env"
+if [ -f "$ENV_FILE" ]; then
+  set -a; source "$ENV_FILE"; set +a
+fi
+
+ES_URL="${ES_URL:?ES_URL is required. Set it in .env}"
+ES_API_KEY="${ES_API_KEY:?ES_API_KEY is required. Set it in .env}"
+
+es() {
+  local method="$1" path="$2"
+  shift 2
+  curl -s -X "$method" "${ES_URL}${path}" \
+    -H "Content-Type: application/json" \
+    -H "Authorization: ApiKey ${ES_API_KEY}" "$@"
+}
+
+json_get() {
+  python3 -c "import json,sys; d=json.load(sys.stdin); print(eval(sys.argv[1], {}, {'d': d}))" "$1"
+}
+
+migrate() {
+  local name="$1"
+  local backing="${name}-000001"
+  echo "--- ${name} ---"
+
+  if [ "$(curl -s -o /dev/null -w "%{http_code}" "${ES_URL}/_alias/${name}" -H "Authorization: ApiKey ${ES_API_KEY}")" -eq 200 ]; then
+    echo "Already an alias — skipped"
+    return 0
+  fi
+  if [ "$(curl -s -o /dev/null -w "%{http_code}" "${ES_URL}/_index_template/${name}" -H "Authorization: ApiKey ${ES_API_KEY}")" -ne 200 ]; then
+    echo "Index template '${name}' not found — run setup/01-indices.sh first"
+    return 1
+  fi
+
+  echo -n "Creating ${backing} ... "
+  es PUT "/${backing}" -o /dev/null -w "%{http_code}\n"
+
+  echo -n "Reindexing ${name} → ${backing} ... "
+  local task_id
+  task_id=$(es POST "/_reindex?wait_for_completion=false&slices=auto" \
+    -d "{\"source\": {\"index\": \"${name}\"}, \"dest\": {\"index\": \"${backing}\", \"op_type\": \"create\"}, \"conflicts\": \"proceed\"}" \
+    | json_get "d['task']")
+  echo "task ${task_id}"
+
+  while true; do
+    local status
+    status=$(es GET "/_tasks/${task_id}")
+    if [ "$(echo "$status" | json_get "d['completed']")" = "True" ]; then
+      echo "  done: $(echo "$status" | json_get "{k: d['response'].get(k) for k in ('total', 'created', 'version_conflicts', 'failures')}")"
+      break
+    fi
+    echo "  progress: $(echo "$status" | json_get "'%s/%s' % (d['task']['status'].get('created', 0), d['task']['status'].get('total', 0))")"
+    sleep 5
+  done
+
+  es POST "/${name},${backing}/_refresh" -o /dev/null
+  local old_count new_count
+  old_count=$(es GET "/${name}/_count" | json_get "d['count']")
+  new_count=$(es GET "/${backing}/_count" | json_get "d['count']")
+  if [ "$old_count" != "$new_count" ]; then
+    echo "Count mismatch (${name}: ${old_count}, ${backing}: ${new_count}) — old index kept, alias not switched"
+    return 1
+  fi
+
+  echo -n "Switching alias ${name} → ${backing} (old index removed) ... "
+  es POST "/_aliases" -o /dev/null -w "%{http_code}\n" -d "{\"actions\": [
+    {\"remove_index\": {\"index\": \"${name}\"}},
+    {\"add\": {\"index\": \"${backing}\", \"alias\": \"${name}\", \"is_write_index\": true}}
+  ]}"
+}
+
+echo "=== Hippocampus Rollover Migration ==="
+echo "ES_URL: ${ES_URL}"
+echo ""
+
+ERRORS=0
+migrate "episodic-memories" || ((ERRORS++))
+migrate "memory-access-log" || ((ERRORS++))
+
+echo ""
+if [ "$ERRORS" -gt 0 ]; then
+  echo "Completed with ${ERRORS} error(s)."
+  exit 1
+else
+  echo "Migration complete. ILM now rolls both indices over by size/age."
+fi
@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""Hippocampus MCP load test — concurrent streamable HTTP sessions
+
+Measures how much traffic one MCP server instance sustains, end to end:
+auth wrapper (_verify_auth) → FastMCP streamable HTTP → tools → ES REST.
+
+By default the server is started as a subprocess (auth on, scheduler off,
+rate limits lifted) against a local ES stand-in with configurable latency,
+so results reflect the server itself rather than a shared cluster.
+Each virtual user keeps one MCP session open and calls tools from a
+weighted remember / reflect / blindspot / export mix.
+
+With --read-replica a second stand-in is started as the read endpoint
+(ES_READ_URL); the report then shows which stand-in served searches vs
+writes, and the server's per-endpoint health from /readyz. Give the replica
+its own latency/error rate to exercise read routing and fallback.
+
+Usage:
+  python test/mcp-load-test.py                                  # 20 users, 30s
+  python test/mcp-load-test.py -c 100 -d 60 --es-latency-ms 40 --es-jitter-ms 20
+  python test/mcp-load-test.py --mix remember=8,blindspot=2 --keep-rate-limits
+  python test/mcp-load-test.py --read-replica --es-latency-ms 80 --read-error-rate 0.3
+  python test/mcp-load-test.py --url https://your-mcp-server.run.app/mcp --token "$MCP_AUTH_TOKEN"
+
+Requires the mcp-server requirements (mcp, httpx, uvicorn, starlette).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+import uvicorn
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+SERVER_PY = Path(__file__).resolve().parent.parent / "mcp-server" / "server.py"
+AUTH_TOKEN = "load-test-token"
+
+TOOLS = {
+    "remember": "remember_memory",
+    "reflect": "reflect_consolidate",
+    "blindspot": "generate_blindspot_report",
+    "export": "export_knowledge_base",
+}
+DEFAULT_MIX = "remember=6,blindspot=2,reflect=1,export=1"
+
+CATEGORIES = ["database", "kubernetes", "network", "cache", "messaging", "ci-cd", "observability"]
+ENTITIES = ["payment-service", "order-api", "auth-gateway", "redis-cluster", "kafka-broker", "search-api"]
+ATTRIBUTES = ["connection-pool-size", "replicas", "timeout", "max-memory", "retention", "heap-size"]
+
+
+# ─── ES stand-in ───────────────────────────────────────────────
+
+KEYED_INDICES = ("entity-catalog", "scheduler-leases")  # ids are names, never synthesized episodes
+EPISODE_ID_RE = re.compile(r"e\d+")
+
+def _fake_episode(i: int) -> dict:
+    entity, attribute = ENTITIES[i % len(ENTITIES)], ATTRIBUTES[i % len(ATTRIBUTES)]
+    return {
+        "raw_text": f"incident #{i}: {entity} {attribute} changed from {i % 50} -> {i % 50 + 10} after alert",
+        "category": CATEGORIES[i % len(CATEGORIES)],
+        "importance": 0.5 + (i % 5) / 10,
+        "timestamp": "2026-01-01T00:00:00Z",
+        "reflected": False,
+        "entity": entity, "attribute": attribute, "value": str(i),
+        "domain": CATEGORIES[i % len(CATEGORIES)], "memory_count": i % 30,
+        "last_updated": "2026-01-01T00:00:00Z",
+    }
+
+
+def _fake_aggs(aggs: dict) -> dict:
+    """Shape-correct results for whatever aggregations the request asked for."""
+    out = {}
+    for name, spec in (aggs or {}).items():
+        sub = spec.get("aggs") or spec.get("aggregations") or {}
+        if "terms" in spec or "composite" in spec:
+            sources = [next(iter(src)) for src in spec.get("composite", {}).get("sources", [])]
+            buckets = []
+            for i, cat in enumerate(CATEGORIES):
+                key = {source: cat for source in sources} if "composite" in spec else cat
+                buckets.append({"key": key, "doc_count": 10 + i, **_fake_aggs(sub)})
+            if "composite" in spec:
+                # One page, then done (the server pages with after_key)
+                out[name] = {"buckets": [] if spec["composite"].get("after") else buckets,
+                             "after_key": buckets[-1]["key"]}
+            else:
+                out[name] = {"buckets": buckets}
+        elif "top_hits" in spec:
+            out[name] = {"hits": {"total": {"value": 1}, "hits": [{"_id": "e0", "_source": _fake_episode(0)}]}}
+        else:  # max / min / avg / sum / cardinality / value_count
+            out[name] = {"value": 1767225600000 if "max" in spec or "min" in spec else 42}
+    return out
+
+
+def _request_kind(method: str, path: str) -> str:
+    if path.endswith("/_search") or path.endswith("/_count"):
+        return "search"
+    if path.endswith("/_mget"):
+        return "get"
+    if path == "/_cluster/health":
+        return "health"
+    if method in ("GET", "HEAD"):
+        return "get"
+    return "write"
+
+
+def build_fake_es(
+    latency_ms: float, jitter_ms: float, error_rate: float, hits_per_page: int,
+) -> tuple[Starlette, dict]:
+    """Stand-in app plus its request counters ({kind: count}, kind = search/write/get/health)."""
+    counter = {"docs": 0, "seq": 0}
+    requests: dict[str, int] = defaultdict(int)
+    # (index, id) → {"_source", "_seq_no"}: documents written by the server, so gets,
+    # conditional puts and creates see what was actually stored (catalog, leases, merges)
+    docs: dict[tuple[str, str], dict] = {}
+
+    def lookup(index: str, doc_id: str) -> dict | None:
+        doc = docs.get((index, doc_id))
+        if doc is None and index not in KEYED_INDICES and EPISODE_ID_RE.fullmatch(doc_id):
+            # Search hits are synthesized as e<i>; treat them as stored episodes once fetched
+            doc = docs[(index, doc_id)] = {"_source": _fake_episode(int(doc_id[1:])), "_seq_no": 0}
+        return doc
+
+    def found(index: str, doc_id: str, doc: dict) -> dict:
+        return {"_index": index, "_id": doc_id, "found": True, "_seq_no": doc["_seq_no"],
+                "_primary_term": 1, "_source": doc["_source"]}
+
+    def write(index: str, doc_id: str, op: str, source: dict, if_seq_no=None) -> int:
+        """Apply one index/create/update/delete the way ES would. Returns the HTTP status."""
+        current = lookup(index, doc_id)
+        if if_seq_no is not None and (current is None or current["_seq_no"] != int(if_seq_no)):
+            return 409
+        if op == "create" and current is not None:
+            return 409
+        if op in ("update", "delete") and current is None:
+            return 404
+        if op == "delete":
+            del docs[(index, doc_id)]
+            return 200
+        if op == "update":
+            source = {**current["_source"], **source.get("doc", {})}
+        counter["seq"] += 1
+        docs[(index, doc_id)] = {"_source": source, "_seq_no": counter["seq"]}
+        return 201 if current is None else 200
+
+    def new_id(prefix: str) -> str:
+        counter["docs"] += 1
+        return f"{prefix}{counter['docs']}"
+
+    async def handle(request: Request):
+        path = request.url.path
+        requests[_request_kind(request.method, path)] += 1
+        delay = max(0.0, random.gauss(latency_ms, jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        if error_rate and random.random() < error_rate:
+            return JSONResponse({"error": {"type": "unavailable"}, "status": 503}, status_code=503)
+
+        raw = await request.body()
+        if request.method == "HEAD":
+            return Response(status_code=200)
+        if path == "/_cluster/health":
+            return JSONResponse({"cluster_name": "fake-es", "status": "green"})
+        if path == "/":
+            return JSONResponse({"name": "fake-es", "version": {"number": "9.0.0"}})
+        if path.startswith("/_inference"):
+            return JSONResponse({"sparse_embedding": [{"embedding": {"warm": 1.0}}]})
+        index = path.split("/")[1]
+        params = request.query_params
+        if path.endswith("/_bulk"):
+            lines = [json.loads(line) for line in raw.decode().split("\n") if line.strip()]
+            items, i = [], 0
+            while i < len(lines):
+                meta = lines[i]
+                op = next(iter(meta)) if isinstance(meta, dict) and len(meta) == 1 else None
+                if op not in ("index", "create", "update", "delete"):
+                    i += 1
+                    continue
+                source = lines[i + 1] if op != "delete" and i + 1 < len(lines) else {}
+                i += 1 if op == "delete" else 2
+                target = meta[op].get("_index", index)
+                doc_id = meta[op].get("_id") or new_id("b")
+                status = write(target, doc_id, op, source, meta[op].get("if_seq_no"))
+                item = {"_index": target, "_id": doc_id, "status": status}
+                if status >= 300:
+                    kind = "version_conflict_engine_exception" if status == 409 else "document_missing_exception"
+                    item["error"] = {"type": kind}
+                items.append({op: item})
+            errors = any(next(iter(item.values()))["status"] >= 300 for item in items)
+            return JSONResponse({"errors": errors, "took": int(delay * 1000), "items": items})
+        if path.endswith("/_mget"):
+            body = json.loads(raw or b"{}")
+            ids = body.get("ids") or [d["_id"] for d in body.get("docs", [])]
+            out = []
+            for doc_id in ids:
+                doc = lookup(index, doc_id)
+                out.append(found(index, doc_id, doc) if doc else {"_index": index, "_id": doc_id, "found": False})
+            return JSONResponse({"docs": out})
+        if path.endswith("/_doc"):
+            doc_id = new_id("d")
+            write(index, doc_id, "index", json.loads(raw or b"{}"))
+            return JSONResponse({"_id": doc_id, "result": "created"}, status_code=201)
+        if "/_doc/" in path or "/_create/" in path or "/_update/" in path:
+            doc_id = path.rsplit("/", 1)[-1]
+            if request.method == "GET":
+                doc = lookup(index, doc_id)
+                if doc is None:
+                    return JSONResponse({"_index": index, "_id": doc_id, "found": False}, status_code=404)
+                return JSONResponse(found(index, doc_id, doc))
+            if request.method == "DELETE":
+                op = "delete"
+            elif "/_update/" in path:
+                op = "update"
+            elif "/_create/" in path or params.get("op_type") == "create":
+                op = "create"
+            else:
+                op = "index"
+            status = write(index, doc_id, op, json.loads(raw or b"{}"), params.get("if_seq_no"))
+            if status == 409:
+                return JSONResponse({"error": {"type": "version_conflict_engine_exception"}, "status": 409},
+                                    status_code=409)
+            if status == 404:
+                return JSONResponse({"error": {"type": "document_missing_exception"}, "status": 404},
+                                    status_code=404)
+            result = {"delete": "deleted", "update": "updated"}.get(op, "created" if status == 201 else "updated")
+            return JSONResponse({"_index": index, "_id": doc_id, "result": result}, status_code=status)
+        if path.endswith("_by_query") or path == "/_reindex":
+            return JSONResponse({"task": f"fake-node:{random.randrange(1, 1 << 30)}"})
+        if path.startswith("/_tasks/"):
+            if path.endswith("/_cancel"):
+                return JSONResponse({"nodes": {}})
+            done = {"total": hits_per_page, "updated": hits_per_page, "batches": 1, "failures": []}
+            return JSONResponse({"completed": True, "task": {"status": done, "running_time_in_nanos": 1_000_000},
+                                 "response": done})
+        if path.endswith("/_search") or path.endswith("/_count"):
+            body = json.loads(raw or b"{}")
+            size = body.get("size", 10)
+            paged = "search_after" in body or body.get("from", 0) > 0
+            if index in KEYED_INDICES:  # catalog reloads / lease scans see only what was written
+                stored = [(doc_id, doc) for (idx, doc_id), doc in docs.items() if idx == index]
+                hits = [{"_id": doc_id, "_index": index, "_score": 1.0, "_seq_no": doc["_seq_no"],
+                         "_primary_term": 1, "_source": doc["_source"], "sort": [i]}
+                        for i, (doc_id, doc) in enumerate([] if paged else stored[:size])]
+            else:
+                hits = [{"_id": f"e{i}", "_index": "fake", "_score": 1.0, "_source": _fake_episode(i), "sort": [i]}
+                        for i in range(0 if paged else min(size, hits_per_page))]
+            n = len(hits)
+            return JSONResponse({
+                "took": int(delay * 1000), "timed_out": False,
+                "hits": {"total": {"value": n, "relation": "eq"}, "hits": hits},
+                "aggregations": _fake_aggs(body.get("aggs") or body.get("aggregations")),
+                "count": n,
+            })
+        if request.method == "DELETE":
+            return JSONResponse({"acknowledged": True})
+        if request.method == "PUT":
+            return JSONResponse({"acknowledged": True, "result": "created"}, status_code=201)
+        return JSONResponse({"acknowledged": True})
+
+    app = Starlette(routes=[Route("/{path:path}", handle, methods=["GET", "POST", "PUT", "DELETE", "HEAD"])])
+    return app, requests
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_es(latency_ms: float, jitter_ms: float, error_rate: float, hits: int) -> tuple[int, dict]:
+    """Run a stand-in in a daemon thread (own event loop). Returns its port and request counters."""
+    port = _free_port()
+    app, requests = build_fake_es(latency_ms, jitter_ms, error_rate, hits)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            sys.exit("fake ES did not start")
+        time.sleep(0.05)
+    return port, requests
+
+
+def start_server(args, es_port: int, read_port: int | None = None) -> tuple[subprocess.Popen, str]:
+    """Start server.py against the stand-in(s) and wait for /readyz."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "ES_URL": f"http://127.0.0.1:{es_port}",
+        "ES_API_KEY": "load-test",
+        "PORT": str(port),
+        "MCP_AUTH_TOKEN": AUTH_TOKEN,
+        "SCHEDULER_ENABLED": "false",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+    }
+    if read_port:
+        env["ES_READ_URL"] = f"http://127.0.0.1:{read_port}"
+        env["ES_HEALTH_INTERVAL_SECONDS"] = "2"
+    if not args.keep_rate_limits:
+        env["TOOL_RATE_LIMITS"] = ",".join(f"{tool}=100000:100000" for tool in TOOLS.values())
+    # stdout carries uvicorn's per-request access log; server errors still reach stderr
+    proc = subprocess.Popen([sys.executable, str(SERVER_PY)], env=env, stdout=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            sys.exit(f"server exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{base}/readyz", timeout=1).status_code == 200:
+                return proc, f"{base}/mcp"
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    sys.exit("server did not become ready within 30s")
+
+
+# ─── Load generation ──────────────────────────────────────────
+
+def _tool_args(kind: str, rng: random.Random) -> dict:
+    if kind == "remember":
+        i = rng.randrange(1_000_000)
+        entity, attribute = rng.choice(ENTITIES), rng.choice(ATTRIBUTES)
+        return {
+            "raw_text": f"load-test {i}: {entity} {attribute} changed to {i % 500} after on-call review",
+            "entity": entity, "attribute": attribute, "value": str(i % 500),
+            "confidence": rng.choice(["0.9", "0.8", "0.5"]), "category": rng.choice(CATEGORIES),
+        }
+    if kind == "reflect":
+        return {"summary_only": rng.random() < 0.5}
+    if kind == "export":
+        return {"max_bytes": 65536}
+    return {}
+
+
+def _classify(result) -> str:
+    """ok | rejected (admission control 429) | error"""
+    if result.isError:
+        return "error"
+    for block in result.content:
+        text = getattr(block, "text", "")
+        try:
+            payload = json.loads(text)
+        except (TypeError, ValueError):
+            continue
+        if isinstance(payload, dict):
+            if payload.get("status") == 429:
+                return "rejected"
+            if "error" in payload:
+                return "error"
+    return "ok"
+
+
+async def virtual_user(uid: int, url: str, headers: dict, mix: list[tuple[str, int]],
+                       stop_at: float, stats: dict, errors: dict) -> None:
+    rng = random.Random(uid)
+    kinds, weights = zip(*mix)
+    try:
+        async with streamablehttp_client(url, headers=headers, timeout=60) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                while time.monotonic() < stop_at:
+                    kind = rng.choices(kinds, weights)[0]
+                    started = time.perf_counter()
+                    try:
+                        result = await session.call_tool(TOOLS[kind], _tool_args(kind, rng))
+                        outcome = _classify(result)
+                    except Exception as e:
+                        outcome = "error"
+                        errors[f"{kind}: {type(e).__name__}: {str(e)[:80]}"] += 1
+                    stats[kind].append((time.perf_counter() - started, outcome))
+    except Exception as e:
+        errors[f"session: {type(e).__name__}: {str(e)[:80]}"] += 1
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def report(stats: dict, errors: dict, elapsed: float) -> dict:
+    rows = {}
+    for kind, samples in sorted(stats.items()):
+        latencies = sorted(s[0] * 1000 for s in samples)
+        outcomes = defaultdict(int)
+        for _, outcome in samples:
+            outcomes[outcome] += 1
+        rows[kind] = {
+            "calls": len(samples),
+            "rps": round(len(samples) / elapsed, 2),
+            "errors": outcomes["error"],
+            "rejected": outcomes["rejected"],
+            "error_rate": round(outcomes["error"] / len(samples), 4) if samples else 0.0,
+            "p50_ms": round(_percentile(latencies, 50), 1),
+            "p95_ms": round(_percentile(latencies, 95), 1),
+            "p99_ms": round(_percentile(latencies, 99), 1),
+            "max_ms": round(latencies[-1], 1) if latencies else 0.0,
+        }
+    total = sum(r["calls"] for r in rows.values())
+    total_errors = sum(r["errors"] for r in rows.values())
+    all_latencies = sorted(s[0] * 1000 for samples in stats.values() for s in samples)
+    rows["TOTAL"] = {
+        "calls": total,
+        "rps": round(total / elapsed, 2),
+        "errors": total_errors,
+        "rejected": sum(r["rejected"] for r in rows.values()),
+        "error_rate": round(total_errors / total, 4) if total else 0.0,
+        "p50_ms": round(_percentile(all_latencies, 50), 1),
+        "p95_ms": round(_percentile(all_latencies, 95), 1),
+        "p99_ms": round(_percentile(all_latencies, 99), 1),
+        "max_ms": round(all_latencies[-1], 1) if all_latencies else 0.0,
+    }
+    return {"elapsed_seconds": round(elapsed, 2), "tools": rows, "error_samples": dict(errors)}
+
+
+def print_report(result: dict) -> None:
+    cols = ["calls", "rps", "errors", "rejected", "error_rate", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    print(f"\n=== MCP load test — {result['elapsed_seconds']}s ===")
+    print(f"{'tool':<10}" + "".join(f"{c:>11}" for c in cols))
+    for kind, row in result["tools"].items():
+        print(f"{kind:<10}" + "".join(f"{row[c]:>11}" for c in cols))
+    if result.get("stand_in_requests"):
+        print("\nES requests served:")
+        for name, counts in result["stand_in_requests"].items():
+            print(f"  {name:<8}" + "  ".join(f"{kind}={counts.get(kind, 0)}" for kind in ("search", "write", "get", "health")))
+    for name, state in result.get("endpoints", {}).items():
+        print(f"  endpoint {name}: healthy={state['healthy']} requests={state['requests']} "
+              f"fallbacks={state['fallbacks']} last_error={state['error']}")
+    if result["error_samples"]:
+        print("\nErrors:")
+        for message, count in sorted(result["error_samples"].items(), key=lambda x: -x[1])[:10]:
+            print(f"  {count:>6}  {message}")
+
+
+def parse_mix(spec: str) -> list[tuple[str, int]]:
+    mix = []
+    for item in filter(None, spec.split(",")):
+        kind, _, weight = item.partition("=")
+        kind = kind.strip()
+        if kind not in TOOLS:
+            sys.exit(f"unknown tool in --mix: {kind} (choose from {', '.join(TOOLS)})")
+        mix.append((kind, int(weight or 1)))
+    return mix
+
+
+async def run(args, url: str, token: str) -> dict:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    stats: dict[str, list] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    mix = parse_mix(args.mix)
+    started = time.monotonic()
+    stop_at = started + args.ramp_up + args.duration
+
+    async def delayed_user(uid: int):
+        await asyncio.sleep(args.ramp_up * uid / max(1, args.concurrency))
+        await virtual_user(uid, url, headers, mix, stop_at, stats, errors)
+
+    await asyncio.gather(*(delayed_user(uid) for uid in range(args.concurrency)))
+    return report(stats, errors, time.monotonic() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-c", "--concurrency", type=int, default=20, help="concurrent MCP sessions")
+    parser.add_argument("-d", "--duration", type=float, default=30, help="seconds of load after ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=2, help="seconds to spread session starts over")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"tool weights (default {DEFAULT_MIX})")
+    parser.add_argument("--url", help="target an already running server (…/mcp) instead of spawning one")
+    parser.add_argument("--token", default=os.getenv("MCP_AUTH_TOKEN", ""), help="Bearer token for --url")
+    parser.add_argument("--es-latency-ms", type=float, default=15, help="stand-in ES mean latency")
+    parser.add_argument("--es-jitter-ms", type=float, default=5, help="stand-in ES latency std deviation")
+    parser.add_argument("--es-error-rate", type=float, default=0.0, help="fraction of ES calls answered 503")
+    parser.add_argument("--es-hits", type=int, default=50, help="hits returned per stand-in search page")
+    parser.add_argument("--keep-rate-limits", action="store_true",
+                        help="keep the server's admission-control rate limits (429s are reported as rejected)")
+    parser.add_argument("--read-replica", action="store_true",
+                        help="start a second stand-in as the read endpoint (ES_READ_URL)")
+    parser.add_argument("--read-latency-ms", type=float, help="read stand-in mean latency (default --es-latency-ms)")
+    parser.add_argument("--read-error-rate", type=float, default=0.0, help="fraction of read stand-in calls answered 503")
+    parser.add_argument("--json", metavar="FILE", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    proc = None
+    stand_ins: dict[str, dict] = {}
+    if args.url:
+        url, token = args.url, args.token
+    else:
+        es_port, stand_ins["primary"] = start_fake_es(
+            args.es_latency_ms, args.es_jitter_ms, args.es_error_rate, args.es_hits,
+        )
+        read_port = None
+        if args.read_replica:
+            read_latency = args.es_latency_ms if args.read_latency_ms is None else args.read_latency_ms
+            read_port, stand_ins["read"] = start_fake_es(
+                read_latency, args.es_jitter_ms, args.read_error_rate, args.es_hits,
+            )
+        proc, url = start_server(args, es_port, read_port)
+        token = AUTH_TOKEN
+        print(f"Server: {url} (ES stand-in :{es_port}, {args.es_latency_ms}±{args.es_jitter_ms}ms)")
+        if read_port:
+            print(f"Read endpoint: stand-in :{read_port}, {read_latency}ms, {args.read_error_rate:.0%} errors")
+
+    print(f"Load: {args.concurrency} sessions × {args.duration}s, mix {args.mix}")
+    try:
+        result = asyncio.run(run(args, url, token))
+        if proc:
+            readyz = httpx.get(url.removesuffix("/mcp") + "/readyz", timeout=5).json()
+            result["endpoints"] = readyz.get("endpoints", {})
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=10)
+    if stand_ins:
+        result["stand_in_requests"] = {name: dict(counts) for name, counts in stand_ins.items()}
+
+    print_report(result)
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2))
+    sys.exit(1 if result["tools"]["TOTAL"]["calls"] == 0 else 0)
+
+
+if __name__ == "__main__":
+    main()